@@ -0,0 +1,277 @@
+import json
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import requests
+from django.conf import settings
+from django.db import connection
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from foodgram.middleware import RequestMetrics
+from ingredient.models import Ingredient
+from recipe.models import Cart, Favorite, Recipe, Tag
+from user.models import Follow, User
+
+VARIABLE = re.compile(r'{{(\w+)}}')
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+VARIABLE_POOLS = {
+    'userId': 'users',
+    'secondUserId': 'users',
+    'thirdUserId': 'users',
+    'firstRecipeId': 'recipes',
+    'secondRecipeId': 'recipes',
+    'firstTagId': 'tag_ids',
+    'secondTagId': 'tag_ids',
+    'thirdTagId': 'tag_ids',
+    'secondTagSlug': 'tag_slugs',
+    'thirdTagSlug': 'tag_slugs',
+    'firstIndredientId': 'ingredients',
+    'secondIndredientId': 'ingredients',
+    'ingredientNameFirstLatter': 'letters',
+}
+WRITE_PAIRS = {
+    ('add_to_favorite // User', 'remove_from_favorite // User'): {
+        'recipes': 'not_favorited',
+    },
+    ('add_to_shopping_cart // User', 'remove_from_shopping_cart // User'): {
+        'recipes': 'not_in_cart',
+    },
+    ('create_subscription // User', 'delete_first_subscription // User'): {
+        'users': 'not_followed',
+    },
+}
+
+
+def is_successful(folders, name):
+    return not any('bad_requests' in folder for folder in folders) and (
+        'non_existing' not in name
+    )
+
+
+def read_collection(items, folders=()):
+    for item in items:
+        if 'item' in item:
+            yield from read_collection(item['item'], (*folders, item['name']))
+            continue
+        request = item['request']
+        auth = request.get('auth') or {}
+        url = request['url']
+        yield {
+            'name': item['name'],
+            'folders': folders,
+            'method': request['method'],
+            'path': '/' + '/'.join(url['path']),
+            'query': [
+                (param['key'], param['value'])
+                for param in url.get('query', ())
+                if not param.get('disabled')
+            ],
+            'authenticated': auth.get('type') == 'apikey',
+        }
+
+
+def load_collection(path):
+    with open(path, encoding='utf-8') as file:
+        collection = list(read_collection(json.load(file)['item']))
+    reads = {}
+    for request in collection:
+        if request['method'] == 'GET' and is_successful(
+            request['folders'], request['name']
+        ):
+            reads.setdefault(get_label(request), request)
+    by_name = {request['name']: request for request in collection}
+    writes = {
+        pair: ([by_name[name] for name in pair], pools)
+        for pair, pools in WRITE_PAIRS.items()
+        if all(name in by_name for name in pair)
+    }
+    return list(reads.values()), list(writes.values())
+
+
+def get_label(request):
+    query = urlencode(request['query'], safe='{}')
+    client = 'user' if request['authenticated'] else 'anonymous'
+    return (
+        f'{request["method"]} {request["path"]}'
+        f'{"?" + query if query else ""} [{client}]'
+    )
+
+
+def get_pools(user):
+    recipes = list(Recipe.objects.order_by('id').values_list('id', flat=True))
+    users = list(
+        User.objects.exclude(pk=user.pk).order_by('id').values_list(
+            'id', flat=True
+        )
+    )
+    favorited = set(
+        Favorite.objects.filter(author=user).values_list('recipe', flat=True)
+    )
+    in_cart = set(
+        Cart.objects.filter(author=user).values_list('recipe', flat=True)
+    )
+    followed = set(
+        Follow.objects.filter(following=user).values_list('user', flat=True)
+    )
+    tags = list(Tag.objects.order_by('id').values_list('id', 'slug'))
+    ingredients = list(
+        Ingredient.objects.order_by('id').values_list('id', 'name')
+    )
+    return {
+        'users': users,
+        'recipes': recipes,
+        'tag_ids': [tag_id for tag_id, _ in tags],
+        'tag_slugs': [slug for _, slug in tags],
+        'ingredients': [ingredient_id for ingredient_id, _ in ingredients],
+        'letters': sorted({name[:1] for _, name in ingredients if name}),
+        'not_favorited': [pk for pk in recipes if pk not in favorited],
+        'not_in_cart': [pk for pk in recipes if pk not in in_cart],
+        'not_followed': [pk for pk in users if pk not in followed],
+    }
+
+
+def resolve(items, pools, overrides, rng):
+    values = {}
+
+    def substitute(match):
+        variable = match.group(1)
+        if variable not in values:
+            pool = VARIABLE_POOLS.get(variable)
+            if pool is None:
+                raise ValueError(f'Unknown collection variable {variable}')
+            pool = overrides.get(pool, pool)
+            if not pools[pool]:
+                raise ValueError(f'Not enough data for {variable}')
+            values[variable] = str(rng.choice(pools[pool]))
+        return values[variable]
+
+    steps = []
+    for request in items:
+        query = urlencode([
+            (key, VARIABLE.sub(substitute, value))
+            for key, value in request['query']
+        ])
+        path = VARIABLE.sub(substitute, request['path'])
+        steps.append((
+            get_label(request), request['method'],
+            f'{path}?{query}' if query else path, request['authenticated']
+        ))
+    return steps
+
+
+def build_plan(reads, writes, pools, number, write_share, rng):
+    plan = []
+    for _ in range(number):
+        if writes and rng.random() < write_share:
+            items, overrides = rng.choice(writes)
+        else:
+            items, overrides = [rng.choice(reads)], {}
+        plan.append(resolve(items, pools, overrides, rng))
+    return plan
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def summarize(samples, duration):
+    endpoints = {}
+    for label in sorted({sample[0] for sample in samples}):
+        rows = [sample for sample in samples if sample[0] == label]
+        latencies = [latency for _, _, latency, _ in rows]
+        queries = [count for _, _, _, count in rows if count is not None]
+        statuses = {}
+        for _, status, _, _ in rows:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        endpoints[label] = {
+            'requests': len(rows),
+            'statuses': statuses,
+            'throughput': round(len(rows) / duration, 2),
+            'mean_ms': round(statistics.mean(latencies), 2),
+            'p50_ms': round(percentile(latencies, 0.5), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'queries': (
+                round(statistics.mean(queries), 2) if queries else None
+            ),
+        }
+    return endpoints
+
+
+class InProcessClient:
+
+    def __init__(self, user):
+        host = settings.ALLOWED_HOSTS[0].lstrip('.').replace('*', 'localhost')
+        self.clients = {
+            False: APIClient(raise_request_exception=False, SERVER_NAME=host),
+            True: APIClient(raise_request_exception=False, SERVER_NAME=host),
+        }
+        token, _ = Token.objects.get_or_create(user=user)
+        self.clients[True].credentials(HTTP_AUTHORIZATION=f'Token {token}')
+
+    def __call__(self, method, path, authenticated):
+        metrics = RequestMetrics()
+        started = time.perf_counter()
+        with connection.execute_wrapper(metrics):
+            response = getattr(self.clients[authenticated], method.lower())(
+                path
+            )
+            if response.streaming:
+                b''.join(response.streaming_content)
+        latency = (time.perf_counter() - started) * 1000
+        return response.status_code, latency, metrics.queries
+
+
+class HttpClient:
+
+    def __init__(self, user, base_url):
+        self.local = threading.local()
+        self.base_url = base_url.rstrip('/')
+        self.token, _ = Token.objects.get_or_create(user=user)
+
+    def __call__(self, method, path, authenticated):
+        headers = (
+            {'Authorization': f'Token {self.token}'} if authenticated else {}
+        )
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        started = time.perf_counter()
+        response = self.local.session.request(
+            method, self.base_url + path, headers=headers
+        )
+        latency = (time.perf_counter() - started) * 1000
+        queries = SERVER_TIMING_QUERIES.search(
+            response.headers.get('Server-Timing', '')
+        )
+        return (
+            response.status_code, latency,
+            int(queries.group(1)) if queries else None
+        )
+
+
+def run_steps(client, steps):
+    return [
+        (label, *client(method, path, authenticated))
+        for label, method, path, authenticated in steps
+    ]
+
+
+def run_plan(client, plan, concurrency=1):
+    if concurrency == 1:
+        return [sample for steps in plan for sample in run_steps(
+            client, steps
+        )]
+    with ThreadPoolExecutor(concurrency) as executor:
+        return [
+            sample
+            for samples in executor.map(
+                lambda steps: run_steps(client, steps), plan
+            )
+            for sample in samples
+        ]
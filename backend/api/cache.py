@@ -0,0 +1,130 @@
+import time
+from datetime import datetime, timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
+from django.views.decorators.http import condition
+from rest_framework.response import Response
+
+from api.models import ReferenceVersion
+
+REFERENCE_VERSION_KEY = 'reference:version'
+
+
+def load_reference_version():
+    reference, _ = ReferenceVersion.objects.get_or_create(
+        pk=1, defaults={'version': int(time.time())}
+    )
+    return reference.version
+
+
+def get_reference_version():
+    version = cache.get(REFERENCE_VERSION_KEY)
+    if version is None:
+        version = load_reference_version()
+        cache.set(
+            REFERENCE_VERSION_KEY, version, settings.REFERENCE_CACHE_TIMEOUT
+        )
+    return version
+
+
+async def aget_reference_version():
+    version = await cache.aget(REFERENCE_VERSION_KEY)
+    if version is None:
+        version = await sync_to_async(load_reference_version)()
+        await cache.aset(
+            REFERENCE_VERSION_KEY, version, settings.REFERENCE_CACHE_TIMEOUT
+        )
+    return version
+
+
+def bump_reference_version():
+    with transaction.atomic():
+        reference, _ = ReferenceVersion.objects.select_for_update(
+        ).get_or_create(pk=1, defaults={'version': 0})
+        reference.version = max(int(time.time()), reference.version + 1)
+        reference.save(update_fields=['version'])
+    cache.set(
+        REFERENCE_VERSION_KEY, reference.version,
+        settings.REFERENCE_CACHE_TIMEOUT
+    )
+    return reference.version
+
+
+def reference_etag(request, *args, **kwargs):
+    return f'"{get_reference_version()}"'
+
+
+def reference_last_modified(request, *args, **kwargs):
+    return datetime.fromtimestamp(get_reference_version(), tz=timezone.utc)
+
+
+cached_reference = method_decorator(
+    condition(
+        etag_func=reference_etag,
+        last_modified_func=reference_last_modified
+    )
+)
+
+
+class ReferenceCacheMixin:
+
+    def get_cached_response(self, view_method, request, *args, **kwargs):
+        key = f'reference:{get_reference_version()}:{request.get_full_path()}'
+        data = cache.get(key)
+        if data is None:
+            data = view_method(request, *args, **kwargs).data
+            cache.set(key, data, settings.REFERENCE_CACHE_TIMEOUT)
+        return Response(data)
+
+    async def aget_cached_response(self, view_method, request, *args,
+                                   **kwargs):
+        version = await aget_reference_version()
+        etag = f'"{version}"'
+        response = get_conditional_response(
+            request, etag=etag, last_modified=version
+        )
+        if response is None:
+            key = f'reference:{version}:{request.get_full_path()}'
+            data = await cache.aget(key)
+            if data is None:
+                data = (await view_method(request, *args, **kwargs)).data
+                await cache.aset(key, data, settings.REFERENCE_CACHE_TIMEOUT)
+            response = Response(data)
+        if not response.has_header('Last-Modified'):
+            response.headers['Last-Modified'] = http_date(version)
+        response.headers.setdefault('ETag', etag)
+        return response
+
+    def get_list_response(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    async def aget_list_response(self, request, *args, **kwargs):
+        return await super().alist(request, *args, **kwargs)
+
+    @cached_reference
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            self.get_list_response, request, *args, **kwargs
+        )
+
+    @cached_reference
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aget_cached_response(
+            self.aget_list_response, request, *args, **kwargs
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aget_cached_response(
+            super().aretrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,330 @@
+import csv
+import zlib
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from fontTools import subset
+from fontTools.ttLib import TTFont
+
+from foodgram.constants import SHOPPING_LIST_PDF_LINES_PER_PAGE
+
+PDF_PAGE_WIDTH = 595
+PDF_PAGE_HEIGHT = 842
+PDF_MARGIN = 50
+PDF_FONT_SIZE = 12
+PDF_LEADING = 15
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def format_line(number, item):
+    return (
+        f'{number}. {item["ingredient__name"]} {item["amount"]} '
+        f'{item["ingredient__measurement_unit"]}'
+    )
+
+
+class Exporter:
+    def open(self):
+        return b''
+
+    def write(self, item):
+        return b''
+
+    def close(self):
+        return b''
+
+
+class TxtExporter(Exporter):
+    def open(self):
+        self.number = 0
+        return b''
+
+    def write(self, item):
+        self.number += 1
+        return f'{format_line(self.number, item)}\n'.encode('utf8')
+
+
+class CsvExporter(Exporter):
+    def open(self):
+        self.writer = csv.writer(Echo())
+        return self.writer.writerow(
+            ['Ингредиент', 'Количество', 'Единица измерения']
+        ).encode('utf8')
+
+    def write(self, item):
+        return self.writer.writerow([
+            item['ingredient__name'],
+            item['amount'],
+            item['ingredient__measurement_unit']
+        ]).encode('utf8')
+
+
+class PDFFont:
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.data = file.read()
+        font = TTFont(BytesIO(self.data))
+        scale = 1000 / font['head'].unitsPerEm
+        self.name = font['name'].getDebugName(6)
+        self.glyph_ids = {
+            code: font.getGlyphID(name)
+            for code, name in font.getBestCmap().items()
+        }
+        self.widths = {
+            font.getGlyphID(name): round(width * scale)
+            for name, (width, _) in font['hmtx'].metrics.items()
+        }
+        head, hhea = font['head'], font['hhea']
+        self.bbox = [
+            round(value * scale)
+            for value in (head.xMin, head.yMin, head.xMax, head.yMax)
+        ]
+        self.ascent = round(hhea.ascent * scale)
+        self.descent = round(hhea.descent * scale)
+        self.cap_height = round(
+            getattr(font['OS/2'], 'sCapHeight', hhea.ascent) * scale
+        )
+
+    def subset(self, glyph_ids):
+        font = TTFont(BytesIO(self.data))
+        options = subset.Options()
+        options.retain_gids = True
+        options.drop_tables += ['FFTM']
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(gids=glyph_ids)
+        subsetter.subset(font)
+        buffer = BytesIO()
+        font.save(buffer)
+        return buffer.getvalue()
+
+
+@lru_cache
+def get_pdf_font():
+    return PDFFont(settings.SHOPPING_LIST_PDF_FONT)
+
+
+def subset_tag(glyph_ids):
+    number = zlib.crc32(','.join(map(str, sorted(glyph_ids))).encode())
+    letters = []
+    for _ in range(6):
+        number, index = divmod(number, 26)
+        letters.append(chr(ord('A') + index))
+    return ''.join(letters)
+
+
+def to_unicode_cmap(characters):
+    entries = [
+        f'<{glyph_id:04X}> <{character.encode("utf-16-be").hex().upper()}>'
+        for glyph_id, character in sorted(characters.items())
+    ]
+    blocks = [
+        f'{len(entries[start:start + 100])} beginbfchar\n'
+        + '\n'.join(entries[start:start + 100]) + '\nendbfchar\n'
+        for start in range(0, len(entries), 100)
+    ]
+    return (
+        '/CIDInit /ProcSet findresource begin\n'
+        '12 dict begin\n'
+        'begincmap\n'
+        '/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) '
+        '/Supplement 0 >> def\n'
+        '/CMapName /Adobe-Identity-UCS def\n'
+        '/CMapType 2 def\n'
+        '1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n'
+        + ''.join(blocks)
+        + 'endcmap\n'
+        'CMapName currentdict /CMap defineresource pop\n'
+        'end\n'
+        'end'
+    ).encode()
+
+
+class PDFWriter:
+    catalog, pages, font = 1, 2, 3
+
+    def __init__(self):
+        self.offsets = {}
+        self.position = 0
+        self.next_number = 4
+        self.page_numbers = []
+        self.pdf_font = get_pdf_font()
+        self.characters = {}
+
+    def allocate(self):
+        self.next_number += 1
+        return self.next_number - 1
+
+    def write(self, data):
+        self.position += len(data)
+        return data
+
+    def write_object(self, number, body):
+        self.offsets[number] = self.position
+        return self.write(
+            f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+        )
+
+    def write_stream(self, number, data, **entries):
+        entries = ''.join(
+            f' /{key} {value}' for key, value in entries.items()
+        )
+        return self.write_object(
+            number,
+            f'<< /Length {len(data)}{entries} >>\nstream\n'.encode()
+            + data + b'\nendstream'
+        )
+
+    def encode(self, text):
+        glyph_ids = []
+        for character in text:
+            glyph_id = self.pdf_font.glyph_ids.get(ord(character), 0)
+            if glyph_id:
+                self.characters.setdefault(glyph_id, character)
+            glyph_ids.append(f'{glyph_id:04X}')
+        return ''.join(glyph_ids).encode()
+
+    def header(self):
+        return self.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def page(self, lines):
+        page_number, content_number = self.allocate(), self.allocate()
+        self.page_numbers.append(page_number)
+        content = b''.join(
+            [
+                f'BT /F1 {PDF_FONT_SIZE} Tf {PDF_LEADING} TL '
+                f'{PDF_MARGIN} {PDF_PAGE_HEIGHT - PDF_MARGIN} Td\n'.encode()
+            ] + [b'<' + self.encode(line) + b"> '\n" for line in lines]
+            + [b'ET']
+        )
+        return self.write_stream(content_number, content) + self.write_object(
+            page_number,
+            (
+                f'<< /Type /Page /Parent {self.pages} 0 R '
+                f'/MediaBox [0 0 {PDF_PAGE_WIDTH} {PDF_PAGE_HEIGHT}] '
+                f'/Resources << /Font << /F1 {self.font} 0 R >> >> '
+                f'/Contents {content_number} 0 R >>'
+            ).encode()
+        )
+
+    def fonts(self):
+        pdf_font = self.pdf_font
+        glyph_ids = sorted({0, *self.characters})
+        name = f'{subset_tag(glyph_ids)}+{pdf_font.name}'
+        cid_font, descriptor = self.allocate(), self.allocate()
+        font_file, to_unicode = self.allocate(), self.allocate()
+        font_data = pdf_font.subset(glyph_ids)
+        widths = ' '.join(
+            f'{glyph_id} [{pdf_font.widths.get(glyph_id, 0)}]'
+            for glyph_id in glyph_ids
+        )
+        bbox = ' '.join(map(str, pdf_font.bbox))
+        return self.write_object(
+            self.font,
+            (
+                f'<< /Type /Font /Subtype /Type0 /BaseFont /{name} '
+                f'/Encoding /Identity-H /DescendantFonts [{cid_font} 0 R] '
+                f'/ToUnicode {to_unicode} 0 R >>'
+            ).encode()
+        ) + self.write_object(
+            cid_font,
+            (
+                f'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{name} '
+                '/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) '
+                f'/Supplement 0 >> /FontDescriptor {descriptor} 0 R '
+                f'/CIDToGIDMap /Identity /W [{widths}] >>'
+            ).encode()
+        ) + self.write_object(
+            descriptor,
+            (
+                f'<< /Type /FontDescriptor /FontName /{name} /Flags 32 '
+                f'/FontBBox [{bbox}] /ItalicAngle 0 '
+                f'/Ascent {pdf_font.ascent} /Descent {pdf_font.descent} '
+                f'/CapHeight {pdf_font.cap_height} /StemV 80 '
+                f'/FontFile2 {font_file} 0 R >>'
+            ).encode()
+        ) + self.write_stream(
+            font_file, zlib.compress(font_data),
+            Length1=len(font_data), Filter='/FlateDecode'
+        ) + self.write_stream(
+            to_unicode, to_unicode_cmap(self.characters)
+        )
+
+    def trailer(self):
+        kids = ' '.join(f'{number} 0 R' for number in self.page_numbers)
+        data = self.write_object(
+            self.pages,
+            (
+                f'<< /Type /Pages /Kids [{kids}] '
+                f'/Count {len(self.page_numbers)} >>'
+            ).encode()
+        ) + self.write_object(
+            self.catalog,
+            f'<< /Type /Catalog /Pages {self.pages} 0 R >>'.encode()
+        ) + self.fonts()
+        xref_position = self.position
+        size = self.next_number
+        xref = [f'xref\n0 {size}\n0000000000 65535 f \n']
+        xref += [
+            f'{self.offsets[number]:010d} 00000 n \n'
+            for number in range(1, size)
+        ]
+        xref.append(
+            f'trailer\n<< /Size {size} /Root {self.catalog} 0 R >>\n'
+            f'startxref\n{xref_position}\n%%EOF\n'
+        )
+        return data + self.write(''.join(xref).encode())
+
+
+class PdfExporter(Exporter):
+    def open(self):
+        self.pdf = PDFWriter()
+        self.number = 0
+        self.lines = []
+        return self.pdf.header()
+
+    def write(self, item):
+        self.number += 1
+        self.lines.append(format_line(self.number, item))
+        if len(self.lines) < SHOPPING_LIST_PDF_LINES_PER_PAGE:
+            return b''
+        page = self.pdf.page(self.lines)
+        self.lines = []
+        return page
+
+    def close(self):
+        data = b''
+        if self.lines or not self.pdf.page_numbers:
+            data = self.pdf.page(self.lines)
+        return data + self.pdf.trailer()
+
+
+def export(exporter_class, items):
+    exporter = exporter_class()
+    yield exporter.open()
+    for item in items:
+        data = exporter.write(item)
+        if data:
+            yield data
+    yield exporter.close()
+
+
+async def aexport(exporter_class, items):
+    exporter = exporter_class()
+    yield exporter.open()
+    async for item in items:
+        data = exporter.write(item)
+        if data:
+            yield data
+    yield exporter.close()
+
+
+EXPORTERS = {
+    'txt': (TxtExporter, 'text/plain; charset=utf-8'),
+    'csv': (CsvExporter, 'text/csv; charset=utf-8'),
+    'pdf': (PdfExporter, 'application/pdf'),
+}
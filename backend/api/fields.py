@@ -0,0 +1,92 @@
+import base64
+import binascii
+import uuid
+
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from PIL import Image
+from rest_framework import serializers
+
+from foodgram import constants
+
+IMAGE_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif'}
+
+
+class StreamingBase64ImageField(serializers.ImageField):
+    default_error_messages = {
+        'invalid_base64': 'Картинка должна быть в формате base64',
+        'too_large': (
+            'Размер картинки не должен превышать '
+            f'{constants.IMAGE_MAX_SIZE // (1024 * 1024)} МБ'
+        ),
+        'too_many_pixels': (
+            'Ширина и высота картинки не должны превышать '
+            f'{constants.IMAGE_MAX_DIMENSION} пикселей'
+        ),
+        'invalid_format': 'Поддерживаются только картинки JPEG, PNG и GIF',
+    }
+
+    def decode_base64(self, data):
+        start = data.find(';base64,')
+        start = 0 if start == -1 else start + len(';base64,')
+        if (len(data) - start) * 3 // 4 > constants.IMAGE_MAX_SIZE:
+            self.fail('too_large')
+        chunk_size = constants.IMAGE_DECODE_CHUNK_SIZE * 4
+        file = TemporaryUploadedFile(
+            'image', 'application/octet-stream', 0, None
+        )
+        try:
+            for position in range(start, len(data), chunk_size):
+                file.write(base64.b64decode(
+                    data[position:position + chunk_size], validate=True
+                ))
+        except (binascii.Error, ValueError):
+            file.close()
+            self.fail('invalid_base64')
+        file.size = file.tell()
+        file.seek(0)
+        return file
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = self.decode_base64(data)
+        elif not isinstance(data, UploadedFile):
+            self.fail('invalid_base64')
+        if data.size > constants.IMAGE_MAX_SIZE:
+            self.fail('too_large')
+        try:
+            with Image.open(data) as image:
+                width, height = image.size
+                image_format = image.format
+        except (OSError, ValueError, Image.DecompressionBombError):
+            self.fail('invalid_image')
+        if image_format not in IMAGE_FORMATS:
+            self.fail('invalid_format')
+        if max(width, height) > constants.IMAGE_MAX_DIMENSION:
+            self.fail('too_many_pixels')
+        data.seek(0)
+        data.name = f'{uuid.uuid4()}.{IMAGE_FORMATS[image_format]}'
+        return super().to_internal_value(data)
+
+
+class PrimaryKeyListField(serializers.ListField):
+    default_error_messages = {
+        'does_not_exist': 'Объектов с id {pk_values} не существует',
+    }
+
+    def __init__(self, queryset, deduplicate=True, **kwargs):
+        self.queryset = queryset
+        self.deduplicate = deduplicate
+        kwargs.setdefault('child', serializers.IntegerField(min_value=1))
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        pk_values = super().to_internal_value(data)
+        if self.deduplicate:
+            pk_values = list(dict.fromkeys(pk_values))
+        objects = self.queryset.in_bulk(pk_values)
+        missing = [pk for pk in dict.fromkeys(pk_values) if pk not in objects]
+        if missing:
+            self.fail(
+                'does_not_exist', pk_values=', '.join(map(str, missing))
+            )
+        return [objects[pk] for pk in pk_values]
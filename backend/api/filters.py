@@ -2,16 +2,31 @@ import django_filters
 
 from ingredient.models import Ingredient
 from recipe.models import Recipe
+from recipe.search import SEARCH_ORDERING, search_recipes
+
+RECIPE_ORDERINGS = {
+    'newest': ('-created_at', '-id'),
+    'popular': ('-popularity', '-created_at', '-id'),
+    'trending': ('-trending', '-created_at', '-id'),
+}
 
 
 class RecipeFilter(django_filters.rest_framework.FilterSet):
     is_favorited = django_filters.CharFilter(method='get_favorite')
     is_in_shopping_cart = django_filters.CharFilter(method='get_cart')
     tags = django_filters.AllValuesMultipleFilter(field_name='tags__slug')
+    search = django_filters.CharFilter(method='get_search')
+    ordering = django_filters.ChoiceFilter(
+        choices=[(name, name) for name in RECIPE_ORDERINGS],
+        method='get_ordering'
+    )
 
     class Meta:
         model = Recipe
-        fields = ['is_favorited', 'is_in_shopping_cart', 'author', 'tags']
+        fields = [
+            'is_favorited', 'is_in_shopping_cart', 'author', 'tags', 'search',
+            'ordering'
+        ]
 
     def get_favorite(self, queryset, name, value):
         user = self.request.user
@@ -25,6 +40,12 @@ class RecipeFilter(django_filters.rest_framework.FilterSet):
             return queryset.filter(carts__author=user)
         return queryset
 
+    def get_search(self, queryset, name, value):
+        return search_recipes(queryset, value).order_by(*SEARCH_ORDERING)
+
+    def get_ordering(self, queryset, name, value):
+        return queryset.order_by(*RECIPE_ORDERINGS[value])
+
 
 class IngredientFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(
@@ -0,0 +1,54 @@
+import threading
+from bisect import bisect_left
+
+from api.cache import get_reference_version
+from ingredient.models import Ingredient
+
+
+class IngredientIndex:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshot = (None, (), ())
+
+    def build(self, version):
+        ingredients = Ingredient.objects.values_list(
+            'id', 'name', 'measurement_unit'
+        )
+        rows = sorted(
+            (name.casefold(), ingredient_id, name, measurement_unit)
+            for ingredient_id, name, measurement_unit in ingredients.iterator()
+        )
+        self.snapshot = (
+            version, tuple(row[0] for row in rows), tuple(rows)
+        )
+
+    def refresh(self):
+        version = get_reference_version()
+        snapshot = self.snapshot
+        if snapshot[0] != version:
+            with self.lock:
+                if self.snapshot[0] != version:
+                    self.build(version)
+                snapshot = self.snapshot
+        return snapshot[1:]
+
+    def search(self, name, measurement_unit=None):
+        keys, rows = self.refresh()
+        query = name.casefold()
+        start = bisect_left(keys, query)
+        end = start
+        while end < len(keys) and keys[end].startswith(query):
+            end += 1
+        matches = [*rows[start:end]] + [
+            row for row in rows
+            if query in row[0] and not row[0].startswith(query)
+        ]
+        return [
+            {'id': ingredient_id, 'name': name, 'measurement_unit': unit}
+            for _, ingredient_id, name, unit in matches
+            if measurement_unit is None or unit == measurement_unit
+        ]
+
+
+ingredient_index = IngredientIndex()
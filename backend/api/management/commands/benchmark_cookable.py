@@ -0,0 +1,84 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from ingredient.models import Ingredient
+from recipe.models import Recipe
+from recipe.search import cookable_recipes
+
+
+class Command(BaseCommand):
+    help = (
+        'This command compares the "what can I cook" query over the '
+        'ingredient id arrays with the same ranking built from the '
+        'ingredient_recipes join: '
+        '>>> python manage.py benchmark_cookable --ingredients 15'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ingredients',
+            type=int,
+            default=15,
+            help='number of ingredients on hand'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=6,
+            help='recipes per page'
+        )
+        parser.add_argument(
+            '--number',
+            type=int,
+            default=20,
+            help='number of random ingredient sets'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='random seed for ingredient sets'
+        )
+
+    def handle(self, *args, **options):
+        ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+        if len(ingredient_ids) < options['ingredients']:
+            raise CommandError('Not enough ingredients in the database')
+        generator = random.Random(options['seed'])
+        pantries = [
+            sorted(generator.sample(ingredient_ids, options['ingredients']))
+            for _ in range(options['number'])
+        ]
+        limit = options['limit']
+        paths = {
+            'array overlap': lambda ids: list(
+                cookable_recipes(Recipe.objects.all(), ids)[:limit]
+            ),
+            'array contained': lambda ids: list(
+                cookable_recipes(Recipe.objects.all(), ids, full=True)[:limit]
+            ),
+            'join overlap': lambda ids: list(
+                Recipe.objects.filter(
+                    ingredient_recipes__ingredient_id__in=ids
+                ).annotate(
+                    ingredients_covered=Count('ingredient_recipes')
+                ).order_by(
+                    '-ingredients_covered', '-created_at', '-id'
+                )[:limit]
+            ),
+        }
+        self.stdout.write(
+            f'{Recipe.objects.count()} recipes, '
+            f'{len(ingredient_ids)} ingredients, '
+            f'{options["ingredients"]} on hand'
+        )
+        for path, query in paths.items():
+            seconds = timeit.timeit(
+                lambda: [query(ids) for ids in pantries], number=1
+            )
+            self.stdout.write(
+                f'{path}: {seconds / len(pantries) * 1000:.1f} ms per query'
+            )
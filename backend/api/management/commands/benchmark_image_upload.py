@@ -0,0 +1,48 @@
+import base64
+import io
+import os
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from drf_extra_fields.fields import Base64ImageField
+from PIL import Image
+
+from api.fields import StreamingBase64ImageField
+
+
+class Command(BaseCommand):
+    help = (
+        'This command compares peak memory of decoding a large base64 '
+        'image with the old and the streaming image fields: '
+        '>>> python manage.py benchmark_image_upload --size 2500'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=2500,
+            help='width and height of the generated noise image'
+        )
+
+    def handle(self, *args, **options):
+        size = options['size']
+        buffer = io.BytesIO()
+        Image.frombytes('RGB', (size, size), os.urandom(size * size * 3)).save(
+            buffer, format='PNG'
+        )
+        data = 'data:image/png;base64,' + base64.b64encode(
+            buffer.getvalue()
+        ).decode()
+        self.stdout.write(f'image: {len(buffer.getvalue()) / 2 ** 20:.1f} MB')
+        fields = {
+            'base64': Base64ImageField(),
+            'streaming': StreamingBase64ImageField(),
+        }
+        for name, field in fields.items():
+            tracemalloc.start()
+            image = field.to_internal_value(data)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            image.close()
+            self.stdout.write(f'{name}: peak {peak / 2 ** 20:.1f} MB')
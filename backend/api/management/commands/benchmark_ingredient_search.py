@@ -0,0 +1,47 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from api.ingredient_search import ingredient_index
+from ingredient.models import Ingredient
+
+
+class Command(BaseCommand):
+    help = (
+        'This command compares ingredient autocomplete served from '
+        'the in-memory index with the ORM istartswith query: '
+        '>>> python manage.py benchmark_ingredient_search --query "мук"'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--query',
+            type=str,
+            default='а',
+            help='prefix to search for'
+        )
+        parser.add_argument(
+            '--number',
+            type=int,
+            default=100,
+            help='number of runs for each path'
+        )
+
+    def handle(self, *args, **options):
+        query = options['query']
+        number = options['number']
+        ingredient_index.refresh()
+        paths = {
+            'index': lambda: ingredient_index.search(query),
+            'orm': lambda: list(
+                Ingredient.objects.filter(name__istartswith=query).values(
+                    'id', 'name', 'measurement_unit'
+                )
+            ),
+        }
+        for path, search in paths.items():
+            seconds = timeit.timeit(search, number=number)
+            self.stdout.write(
+                f'{path}: {len(search())} results, '
+                f'{seconds / number * 1_000_000:.1f} µs per query'
+            )
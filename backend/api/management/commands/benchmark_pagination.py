@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory
+
+from api.paginator import RecipePaginator
+from api.views import RecipeView
+from recipe.models import Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        'This command compares the latency of the recipe feed on the first '
+        'and a deep page in page-number and cursor mode: '
+        '>>> python manage.py benchmark_pagination --page 5000'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page',
+            type=int,
+            default=5000,
+            help='deep page number to compare with the first page'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=6,
+            help='recipes per page'
+        )
+        parser.add_argument(
+            '--number',
+            type=int,
+            default=20,
+            help='number of requests for each case'
+        )
+
+    def get_cursor(self, offset):
+        if not offset:
+            return ''
+        paginator = RecipePaginator()
+        paginator.ordering = paginator.cursor_ordering
+        recipe = Recipe.objects.order_by(*paginator.ordering)[offset - 1]
+        return paginator.encode_cursor(recipe)
+
+    def measure(self, params, number):
+        host = settings.ALLOWED_HOSTS[0].lstrip('.').replace('*', 'localhost')
+        factory = APIRequestFactory(SERVER_NAME=host)
+        view = RecipeView.as_view({'get': 'list'})
+        started = time.perf_counter()
+        for _ in range(number):
+            response = view(factory.get('/api/recipes/', params))
+            response.render()
+        return (time.perf_counter() - started) / number * 1000
+
+    def handle(self, *args, **options):
+        page, limit = options['page'], options['limit']
+        offset = (page - 1) * limit
+        if Recipe.objects.count() <= offset:
+            raise CommandError(
+                f'Page {page} does not exist, add more recipes first'
+            )
+        for number in (1, page):
+            cases = {
+                'page': {'page': number, 'limit': limit},
+                'cursor': {
+                    'cursor': self.get_cursor((number - 1) * limit),
+                    'limit': limit
+                },
+            }
+            for mode, params in cases.items():
+                latency = self.measure(params, options['number'])
+                self.stdout.write(
+                    f'page {number}, {mode} mode: {latency:.2f} ms'
+                )
@@ -0,0 +1,476 @@
+import base64
+import io
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLResolver, get_resolver, reverse
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.cache import bump_reference_version
+from ingredient.models import Ingredient
+from recipe.counters import COUNTERS, reconcile_counters
+from recipe.models import Cart, Favorite, IngredientRecipe, Recipe, Tag
+from recipe.search import update_search_fields
+from recipe.shopping_list import rebuild_shopping_lists
+from user.models import Follow, User
+
+PASSWORD = 'QueryCheck-12345'
+LIMIT = 10000
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def png_base64():
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 4), 'red').save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+def walk(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from walk(pattern.url_patterns)
+        elif 'format' not in pattern.pattern.regex.groupindex:
+            yield pattern
+
+
+def get_routes():
+    routes = set()
+    for pattern in walk(get_resolver('api.urls').url_patterns):
+        view = pattern.callback
+        methods = getattr(view, 'actions', None)
+        if methods is None:
+            view_class = getattr(view, 'cls', view.view_class)
+            methods = [
+                method for method in view_class.http_method_names
+                if hasattr(view_class, method)
+            ]
+        # DRF adds 'head' to a viewset's actions on its first GET request.
+        routes.update(
+            (pattern.name, method) for method in methods
+            if method not in ('head', 'options')
+        )
+    return routes
+
+
+class Command(BaseCommand):
+    help = (
+        'This command calls every API route with N and then 10N recipes, '
+        'users, follows, favorites and carts in the database and fails '
+        'if the number of queries of any request grows with N or a route '
+        'answers with a server error that is not allowed. Recipes '
+        'have different ingredient counts and amounts, and the recipes the '
+        'requests change get every new ingredient. All data '
+        'is created in a transaction that is rolled back: '
+        '>>> python manage.py check_query_counts --size 5'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=5,
+            help='number of rows of each kind in the first run'
+        )
+        parser.add_argument(
+            '--factor',
+            type=int,
+            default=10,
+            help='how many times more rows the second run has'
+        )
+        parser.add_argument(
+            '--allow-server-errors',
+            nargs='*',
+            default=[],
+            metavar='ROUTE',
+            help='names of routes that are known to answer with a 5xx'
+        )
+
+    def create_user(self, name):
+        return User.objects.create_user(
+            username=name, email=f'{name}@querycheck.ru', first_name=name,
+            last_name=name, password=PASSWORD
+        )
+
+    def create_recipe(self, author, name):
+        recipe = Recipe.objects.create(
+            author=author, name=name, text=name, cooking_time=5,
+            image='recipe_img/querycheck.png'
+        )
+        recipe.tags.set(self.base_tags)
+        IngredientRecipe.objects.bulk_create([
+            IngredientRecipe(
+                recipe=recipe, ingredient=ingredient, amount=index + 1
+            )
+            for index, ingredient in enumerate(self.base_ingredients)
+        ])
+        update_search_fields([recipe.pk])
+        return recipe
+
+    def create_context(self):
+        self.base_tags = Tag.objects.bulk_create([
+            Tag(
+                name=f'querycheck_base{i}', color=f'#fffff{i}',
+                slug=f'querycheck_base{i}'
+            )
+            for i in range(2)
+        ])
+        self.base_ingredients = Ingredient.objects.bulk_create([
+            Ingredient(name=f'querycheck_base{i}', measurement_unit='г')
+            for i in range(3)
+        ])
+        self.viewer = self.create_user('querycheck_viewer')
+        self.stranger = self.create_user('querycheck_stranger')
+        self.own_recipe = self.create_recipe(self.viewer, 'querycheck own')
+        self.fresh_recipe = self.create_recipe(
+            self.stranger, 'querycheck fresh'
+        )
+        Cart.objects.create(author=self.viewer, recipe=self.own_recipe)
+        self.token = Token.objects.create(user=self.viewer)
+        self.targets = [self.own_recipe, self.fresh_recipe]
+        self.seeded = 0
+
+    def seed(self, size):
+        start, self.seeded = self.seeded, self.seeded + size
+        names = [f'querycheck{i}' for i in range(start, self.seeded)]
+        users = User.objects.bulk_create([
+            User(
+                username=name, email=f'{name}@querycheck.ru',
+                first_name=name, last_name=name, password='!'
+            )
+            for name in names
+        ])
+        tags = Tag.objects.bulk_create([
+            Tag(name=name, color=f'#{i:06x}', slug=name)
+            for i, name in enumerate(names, start=start)
+        ])
+        ingredients = Ingredient.objects.bulk_create([
+            Ingredient(name=name, measurement_unit='г') for name in names
+        ])
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                author=user, name=user.username, text=user.username,
+                cooking_time=5, image='recipe_img/querycheck.png'
+            )
+            for user in users
+        ])
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe=recipe, tag=tag)
+            for recipe in recipes for tag in (tags[0], *self.base_tags)
+        ])
+        if not start:
+            self.targets.append(recipes[0])
+        rows = [
+            IngredientRecipe(recipe=recipe, ingredient=ingredient, amount=i)
+            for recipe in self.targets
+            for i, ingredient in enumerate(ingredients, start=start + 10)
+        ]
+        for i, recipe in enumerate(recipes):
+            if recipe in self.targets:
+                continue
+            extra = ingredients[i:i + i % 4]
+            rows.extend(
+                IngredientRecipe(
+                    recipe=recipe, ingredient=ingredient, amount=i + number
+                )
+                for number, ingredient in enumerate(
+                    (*extra, *self.base_ingredients), start=1
+                )
+            )
+        IngredientRecipe.objects.bulk_create(rows)
+        Follow.objects.bulk_create([
+            Follow(user=user, following=self.viewer) for user in users
+        ] + [
+            Follow(user=self.viewer, following=user) for user in users
+        ])
+        for model in (Favorite, Cart):
+            model.objects.bulk_create([
+                model(author=author, recipe=recipe)
+                for recipe in recipes for author in (self.viewer, users[0])
+            ])
+        update_search_fields([recipe.pk for recipe in recipes])
+        for model in COUNTERS:
+            reconcile_counters(model)
+        rebuild_shopping_lists()
+
+    def get_cases(self):
+        viewer, stranger = self.viewer, self.stranger
+        own, fresh = self.own_recipe.pk, self.fresh_recipe.pk
+        author = User.objects.get(username='querycheck0')
+        seeded = author.recipes.get().pk
+        recipe = {
+            'name': 'querycheck new',
+            'text': 'querycheck',
+            'cooking_time': 5,
+            'image': png_base64(),
+            'tags': [tag.pk for tag in self.base_tags],
+            'ingredients': [
+                {'id': ingredient.pk, 'amount': 2}
+                for ingredient in self.base_ingredients
+            ],
+        }
+        password = {
+            'current_password': PASSWORD, 'new_password': 'Kv7-new-secret-91'
+        }
+        user = {
+            'email': 'querycheck_new@querycheck.ru',
+            'username': 'querycheck_new',
+            'first_name': 'querycheck_new',
+            'last_name': 'querycheck_new',
+            'password': PASSWORD,
+        }
+        ingredient_ids = '&'.join(
+            f'ingredients={ingredient.pk}'
+            for ingredient in self.base_ingredients
+        )
+        return {
+            ('api-root', 'get'): [('api-root', {}, '', None)],
+            ('recipes-list', 'get'): [
+                ('recipes-list', {}, f'?limit={LIMIT}', None),
+                ('recipes-list', {}, f'?limit={LIMIT}&is_favorited=1', None),
+                (
+                    'recipes-list', {},
+                    f'?limit={LIMIT}&is_in_shopping_cart=1', None
+                ),
+                ('recipes-list', {}, f'?limit={LIMIT}&ordering=popular', None),
+                (
+                    'recipes-list', {},
+                    f'?limit={LIMIT}&search=querycheck', None
+                ),
+                ('recipes-list', {}, f'?limit={LIMIT}&cursor=', None),
+            ],
+            ('recipes-list', 'post'): [('recipes-list', {}, '', recipe)],
+            ('recipes-cookable', 'get'): [(
+                'recipes-cookable', {},
+                f'?limit={LIMIT}&{ingredient_ids}', None
+            )],
+            ('recipes-download-shopping-cart', 'get'): [
+                ('recipes-download-shopping-cart', {}, f'?format={file}', None)
+                for file in ('txt', 'csv', 'pdf')
+            ],
+            ('recipes-detail', 'get'): [
+                ('recipes-detail', {'pk': own}, '', None)
+            ],
+            ('recipes-detail', 'put'): [
+                ('recipes-detail', {'pk': own}, '', recipe)
+            ],
+            ('recipes-detail', 'patch'): [
+                ('recipes-detail', {'pk': own}, '', {'name': 'querycheck'})
+            ],
+            ('recipes-detail', 'delete'): [
+                ('recipes-detail', {'pk': own}, '', None)
+            ],
+            ('recipes-favorite', 'post'): [
+                ('recipes-favorite', {'pk': fresh}, '', {})
+            ],
+            ('recipes-favorite', 'delete'): [
+                ('recipes-favorite', {'pk': seeded}, '', None)
+            ],
+            ('recipes-shopping-cart', 'post'): [
+                ('recipes-shopping-cart', {'pk': fresh}, '', {})
+            ],
+            ('recipes-shopping-cart', 'delete'): [
+                ('recipes-shopping-cart', {'pk': seeded}, '', None)
+            ],
+            ('recipes-bulk-favorite', 'post'): [(
+                'recipes-bulk-favorite', {}, '',
+                {'recipes': [fresh, seeded]}
+            )],
+            ('recipes-bulk-favorite', 'delete'): [
+                ('recipes-bulk-favorite', {}, '', {'recipes': [seeded]})
+            ],
+            ('recipes-bulk-shopping-cart', 'post'): [(
+                'recipes-bulk-shopping-cart', {}, '',
+                {'recipes': [fresh, seeded]}
+            )],
+            ('recipes-bulk-shopping-cart', 'delete'): [(
+                'recipes-bulk-shopping-cart', {}, '', {'recipes': [seeded]}
+            )],
+            ('tags-list', 'get'): [('tags-list', {}, '', None)],
+            ('tags-detail', 'get'): [
+                ('tags-detail', {'pk': self.base_tags[0].pk}, '', None)
+            ],
+            ('ingredients-list', 'get'): [
+                ('ingredients-list', {}, '', None),
+                ('ingredients-list', {}, '?name=querycheck', None),
+            ],
+            ('ingredients-detail', 'get'): [(
+                'ingredients-detail',
+                {'pk': self.base_ingredients[0].pk}, '', None
+            )],
+            ('user-list', 'get'): [('user-list', {}, f'?limit={LIMIT}', None)],
+            ('user-list', 'post'): [('user-list', {}, '', user)],
+            ('user-me', 'get'): [('user-me', {}, '', None)],
+            ('user-subscriptions', 'get'): [(
+                'user-subscriptions', {},
+                f'?limit={LIMIT}&recipes_limit=3', None
+            )],
+            ('user-detail', 'get'): [
+                ('user-detail', {'id': stranger.pk}, '', None)
+            ],
+            ('user-detail', 'put'): [(
+                'user-detail', {'id': viewer.pk}, '',
+                {
+                    'email': viewer.email, 'username': viewer.username,
+                    'first_name': 'querycheck_renamed',
+                    'last_name': 'querycheck_renamed'
+                }
+            )],
+            ('user-detail', 'patch'): [(
+                'user-detail', {'id': viewer.pk}, '',
+                {'first_name': 'querycheck_renamed'}
+            )],
+            ('user-detail', 'delete'): [(
+                'user-detail', {'id': viewer.pk}, '',
+                {'current_password': PASSWORD}
+            )],
+            ('user-subscribe', 'post'): [
+                ('user-subscribe', {'id': stranger.pk}, '', {})
+            ],
+            ('user-subscribe', 'delete'): [
+                ('user-subscribe', {'id': author.pk}, '', None)
+            ],
+            ('user-bulk-subscribe', 'post'): [(
+                'user-bulk-subscribe', {}, '',
+                {'users': [stranger.pk, author.pk]}
+            )],
+            ('user-bulk-subscribe', 'delete'): [
+                ('user-bulk-subscribe', {}, '', {'users': [author.pk]})
+            ],
+            ('user-set-password', 'post'): [
+                ('user-set-password', {}, '', password)
+            ],
+            ('user-set-username', 'post'): [(
+                'user-set-username', {}, '',
+                {
+                    'current_password': PASSWORD,
+                    'new_email': 'querycheck_email@querycheck.ru'
+                }
+            )],
+            ('user-activation', 'post'): [
+                ('user-activation', {}, '', {'uid': 'x', 'token': 'x'})
+            ],
+            ('user-resend-activation', 'post'): [
+                ('user-resend-activation', {}, '', {'email': viewer.email})
+            ],
+            ('user-reset-password', 'post'): [
+                ('user-reset-password', {}, '', {'email': viewer.email})
+            ],
+            ('user-reset-password-confirm', 'post'): [(
+                'user-reset-password-confirm', {}, '',
+                {'uid': 'x', 'token': 'x', 'new_password': PASSWORD}
+            )],
+            ('user-reset-username', 'post'): [
+                ('user-reset-username', {}, '', {'email': viewer.email})
+            ],
+            ('user-reset-username-confirm', 'post'): [(
+                'user-reset-username-confirm', {}, '',
+                {'uid': 'x', 'token': 'x', 'new_email': viewer.email}
+            )],
+            ('login', 'post'): [(
+                'login', {}, '',
+                {'email': viewer.email, 'password': PASSWORD}
+            )],
+            ('logout', 'post'): [('logout', {}, '', {})],
+        }
+
+    def request(self, client, method, name, kwargs, query, data):
+        bump_reference_version()
+        path = reverse(name, kwargs=kwargs) + query
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(client, method)(path, data, format='json')
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            transaction.set_rollback(True)
+        return (
+            f'{method.upper()} {path}', name, response.status_code,
+            [query['sql'] for query in queries.captured_queries]
+        )
+
+    def run_cases(self, cases):
+        host = settings.ALLOWED_HOSTS[0].lstrip('.').replace('*', 'localhost')
+        clients = {
+            'anonymous': APIClient(
+                raise_request_exception=False, SERVER_NAME=host
+            ),
+            'user': APIClient(raise_request_exception=False, SERVER_NAME=host),
+        }
+        clients['user'].credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+        results = {}
+        for (name, method), requests in sorted(cases.items()):
+            for client_name, client in clients.items():
+                if method != 'get' and client_name == 'anonymous':
+                    continue
+                for request in requests:
+                    label, route, status, queries = self.request(
+                        client, method, *request
+                    )
+                    results[(label, client_name)] = (route, status, queries)
+        return results
+
+    def report_growth(self, small, large):
+        grown = Counter(
+            LITERALS.sub('?', sql) for sql in large
+        ) - Counter(LITERALS.sub('?', sql) for sql in small)
+        for sql, count in grown.most_common(5):
+            self.stdout.write(f'    +{count}: {sql[:300]}')
+
+    def handle(self, *args, **options):
+        size, factor = options['size'], options['factor']
+        email_backend = 'django.core.mail.backends.locmem.EmailBackend'
+        with override_settings(EMAIL_BACKEND=email_backend), \
+                transaction.atomic():
+            self.create_context()
+            self.seed(size)
+            cases = self.get_cases()
+            missing = get_routes() - cases.keys()
+            small = self.run_cases(cases)
+            self.seed(size * (factor - 1))
+            large = self.run_cases(cases)
+            transaction.set_rollback(True)
+        failed, errors = [], []
+        for key, (route, status, small_queries) in small.items():
+            label, client_name = key
+            _, large_status, large_queries = large[key]
+            line = (
+                f'{label} [{client_name}] {status}/{large_status}: '
+                f'{len(small_queries)} -> {len(large_queries)} queries'
+            )
+            server_error = max(status, large_status) >= 500 and (
+                route not in options['allow_server_errors']
+            )
+            if server_error:
+                errors.append(key)
+                line += ', server error'
+            if len(large_queries) > len(small_queries):
+                failed.append(key)
+            if server_error or key in failed:
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+            if key in failed:
+                self.report_growth(small_queries, large_queries)
+        for name, method in sorted(missing):
+            self.stdout.write(
+                self.style.ERROR(
+                    f'{method.upper()} {name}: no request defined'
+                )
+            )
+        if failed or errors or missing:
+            raise CommandError(
+                f'{len(failed)} requests make more queries with more data, '
+                f'{len(errors)} requests fail with a server error, '
+                f'{len(missing)} routes are not covered'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(small)} requests make the same number of queries with '
+            f'{size} and {size * factor} rows'
+        ))
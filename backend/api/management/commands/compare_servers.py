@@ -0,0 +1,212 @@
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmark import (HttpClient, build_plan, get_pools, load_collection,
+                           percentile, run_plan, summarize)
+from api.management.commands.run_benchmark import COLLECTION
+from recipe.fixtures import fixture_email
+from user.models import User
+
+MODES = {
+    'wsgi': {'SERVER_MODE': 'wsgi'},
+    'asgi': {'SERVER_MODE': 'asgi', 'ASYNC_VIEWS': 'True'},
+    'asgi-sync': {'SERVER_MODE': 'asgi', 'ASYNC_VIEWS': 'False'},
+}
+START_TIMEOUT = 30
+
+
+class Command(BaseCommand):
+    help = (
+        'This command starts gunicorn with the same number of workers in '
+        'every mode (sync WSGI workers, uvicorn workers with async read '
+        'views, uvicorn workers with sync views only), replays the same '
+        'Postman collection plan against each of them with parallel '
+        'clients and compares throughput and latency percentiles: '
+        '>>> python manage.py compare_servers --workers 2 --concurrency 16'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modes',
+            nargs='+',
+            choices=MODES,
+            default=['wsgi', 'asgi'],
+            help='server modes to compare'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='number of gunicorn workers in every mode'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='number of parallel clients'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='number of measured steps'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=100,
+            help='number of steps run before measuring'
+        )
+        parser.add_argument(
+            '--writes',
+            type=float,
+            default=0,
+            help='share of steps that add and remove a favorite, cart '
+                 'item or subscription'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='random seed of the request plan'
+        )
+        parser.add_argument(
+            '--email',
+            default=fixture_email(0),
+            help='user whose token authenticated requests use'
+        )
+        parser.add_argument(
+            '--collection',
+            default=COLLECTION,
+            help='path to the Postman collection'
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8765,
+            help='port the servers listen on'
+        )
+        parser.add_argument(
+            '--output',
+            help='file to save the results to'
+        )
+
+    def start_server(self, mode, workers, port):
+        process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn',
+                '--config', 'gunicorn.conf.py',
+                '--bind', f'127.0.0.1:{port}',
+                '--workers', str(workers),
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, **MODES[mode]},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'The {mode} server has not started')
+            try:
+                requests.get(f'http://127.0.0.1:{port}/api/tags/', timeout=1)
+                return process
+            except requests.ConnectionError:
+                time.sleep(0.2)
+        process.terminate()
+        raise CommandError(f'The {mode} server has not started in time')
+
+    def measure(self, mode, user, plan, options):
+        process = self.start_server(
+            mode, options['workers'], options['port']
+        )
+        try:
+            client = HttpClient(user, f'http://127.0.0.1:{options["port"]}')
+            run_plan(client, plan[:options['warmup']], options['concurrency'])
+            started = time.perf_counter()
+            samples = run_plan(
+                client, plan[options['warmup']:], options['concurrency']
+            )
+            duration = time.perf_counter() - started
+        finally:
+            process.terminate()
+            process.wait()
+        latencies = [latency for _, _, latency, _ in samples]
+        return {
+            'requests': len(samples),
+            'errors': sum(status >= 500 for _, status, _, _ in samples),
+            'duration_s': round(duration, 2),
+            'throughput': round(len(samples) / duration, 2),
+            'p50_ms': round(percentile(latencies, 0.5), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'endpoints': summarize(samples, duration),
+        }
+
+    def report(self, results):
+        for mode, result in results.items():
+            self.stdout.write(self.style.SUCCESS(
+                f'{mode}: {result["requests"]} requests in '
+                f'{result["duration_s"]} s, {result["throughput"]} requests '
+                f'per second, p50 {result["p50_ms"]} / p95 '
+                f'{result["p95_ms"]} / p99 {result["p99_ms"]} ms, '
+                f'{result["errors"]} errors'
+            ))
+        labels = sorted({
+            label for result in results.values()
+            for label in result['endpoints']
+        })
+        for label in labels:
+            self.stdout.write(f'{label}:')
+            for mode, result in results.items():
+                endpoint = result['endpoints'].get(label)
+                if endpoint is None:
+                    continue
+                self.stdout.write(
+                    f'    {mode}: {endpoint["throughput"]} requests per '
+                    f'second, p50 {endpoint["p50_ms"]} / p95 '
+                    f'{endpoint["p95_ms"]} ms, statuses '
+                    f'{endpoint["statuses"]}'
+                )
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=options['email']).first()
+        if user is None:
+            raise CommandError(
+                f'User {options["email"]} does not exist, add a dataset '
+                'with generate_fixtures first'
+            )
+        reads, writes = load_collection(options['collection'])
+        try:
+            plan = build_plan(
+                reads, writes, get_pools(user),
+                options['warmup'] + options['requests'], options['writes'],
+                random.Random(options['seed'])
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        results = {
+            mode: self.measure(mode, user, plan, options)
+            for mode in options['modes']
+        }
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(
+                    {
+                        'workers': options['workers'],
+                        'concurrency': options['concurrency'],
+                        'seed': options['seed'],
+                        'writes': options['writes'],
+                        'modes': results,
+                    },
+                    file, ensure_ascii=False, indent=2
+                )
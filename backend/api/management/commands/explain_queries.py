@@ -0,0 +1,167 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.filters import RECIPE_ORDERINGS
+from api.paginator import RecipePaginator
+from ingredient.models import Ingredient
+from recipe.models import Recipe, ShoppingListItem
+from recipe.search import cookable_recipes, search_recipes
+from user.models import Follow, User
+
+
+class Command(BaseCommand):
+    help = (
+        'This command runs EXPLAIN for the hot API queries with sequential '
+        'scans disabled and fails if any of them still needs one or does '
+        'not use its index. Deep cursor pages must also seek into their '
+        'index with a row comparison instead of filtering it from the top. '
+        'Requires PostgreSQL: >>> python manage.py explain_queries'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose_plans',
+            action='store_true',
+            help='print the plan of every query'
+        )
+
+    def get_queries(self):
+        user = User.objects.order_by('id').first() or User(id=0)
+        return {
+            'recipe feed': (
+                Recipe.objects.all()[:6], 'recipe_created_at_id_idx'
+            ),
+            'popular recipes': (
+                Recipe.objects.order_by(*RECIPE_ORDERINGS['popular'])[:6],
+                'recipe_popularity_idx'
+            ),
+            'trending recipes': (
+                Recipe.objects.order_by(*RECIPE_ORDERINGS['trending'])[:6],
+                'recipe_trending_idx'
+            ),
+            'popularity refresh queue': (
+                Recipe.objects.filter(popularity_dirty=True).order_by(
+                    'id'
+                )[:1000],
+                'recipe_popularity_dirty_idx'
+            ),
+            'recipe search': (
+                search_recipes(Recipe.objects.all(), 'курица'),
+                'recipe_search_vector_idx'
+            ),
+            'cookable recipes': (
+                cookable_recipes(Recipe.objects.all(), [1, 2, 3])[:6],
+                'recipe_ingredient_ids_idx'
+            ),
+            'recipes by author': (
+                Recipe.objects.filter(author=user)[:6],
+                'recipe_author_created_id_idx'
+            ),
+            'recipes by tags': (
+                Recipe.objects.filter(
+                    tags__slug__in=['breakfast', 'dinner']
+                )[:6],
+                None
+            ),
+            'favorited recipes': (
+                Recipe.objects.filter(favorites__author=user)[:6], None
+            ),
+            'recipes in cart': (
+                Recipe.objects.filter(carts__author=user)[:6], None
+            ),
+            'subscriptions': (
+                Follow.objects.filter(following=user),
+                'follow_following_user_idx'
+            ),
+            'ingredient autocomplete': (
+                Ingredient.objects.filter(name__istartswith='мук'),
+                'ingredient_name_upper_idx'
+            ),
+            'shopping list': (
+                ShoppingListItem.objects.filter(user=user), None
+            ),
+        }
+
+    def get_cursor_page(self, queryset, ordering):
+        paginator = RecipePaginator()
+        paginator.ordering = ordering
+        queryset = queryset.order_by(*ordering)
+        count = queryset.count()
+        recipe = (
+            queryset[count // 2] if count
+            else Recipe(id=0, created_at=timezone.now())
+        )
+        values = paginator.decode_cursor(
+            paginator.encode_cursor(recipe), queryset
+        )
+        return queryset.filter(paginator.get_cursor_filter(values))[:6]
+
+    def get_cursor_queries(self):
+        user = User.objects.order_by('id').first() or User(id=0)
+        return {
+            'deep recipe feed cursor': (
+                self.get_cursor_page(
+                    Recipe.objects.all(), RECIPE_ORDERINGS['newest']
+                ),
+                'recipe_created_at_id_idx'
+            ),
+            'deep popular recipes cursor': (
+                self.get_cursor_page(
+                    Recipe.objects.all(), RECIPE_ORDERINGS['popular']
+                ),
+                'recipe_popularity_idx'
+            ),
+            'deep trending recipes cursor': (
+                self.get_cursor_page(
+                    Recipe.objects.all(), RECIPE_ORDERINGS['trending']
+                ),
+                'recipe_trending_idx'
+            ),
+            'deep recipes by author cursor': (
+                self.get_cursor_page(
+                    Recipe.objects.filter(author=user),
+                    RECIPE_ORDERINGS['newest']
+                ),
+                'recipe_author_created_id_idx'
+            ),
+        }
+
+    def explain(self, name, queryset, index, verbose, seek=False):
+        plan = queryset.explain()
+        if verbose:
+            self.stdout.write(f'{name}:\n{plan}\n')
+        seeks = any(
+            'Index Cond:' in line and 'ROW(' in line
+            for line in plan.splitlines()
+        )
+        if (
+            'Seq Scan' in plan or (index and index not in plan)
+            or (seek and not seeks)
+        ):
+            self.stdout.write(self.style.ERROR(f'{name}:\n{plan}'))
+            return False
+        self.stdout.write(self.style.SUCCESS(f'{name}: OK'))
+        return True
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('explain_queries requires PostgreSQL')
+        failed = []
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            for name, (queryset, index) in self.get_queries().items():
+                if not self.explain(
+                    name, queryset, index, options['verbose_plans']
+                ):
+                    failed.append(name)
+            for name, (queryset, index) in self.get_cursor_queries().items():
+                if not self.explain(
+                    name, queryset, index, options['verbose_plans'], True
+                ):
+                    failed.append(name)
+        if failed:
+            raise CommandError(
+                f'Sequential scan or missing index in: {", ".join(failed)}'
+            )
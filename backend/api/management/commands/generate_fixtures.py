@@ -0,0 +1,93 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipe.fixtures import DEFAULTS, PASSWORD, fixture_email, generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'This command adds synthetic users, recipes with ingredients and '
+        'tags, follows, favorites and carts. Authors, followed users, '
+        'favorite recipes and ingredients follow a Zipf distribution. Rows '
+        'are the same for the same seed and sizes, whatever the number of '
+        'workers. Requires PostgreSQL: '
+        '>>> python manage.py generate_fixtures --users 1000000 '
+        '--recipes 2000000 --workers 8'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=1000,
+            help='number of users'
+        )
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=10000,
+            help='number of recipes'
+        )
+        parser.add_argument(
+            '--follows',
+            type=float,
+            default=DEFAULTS['follows'],
+            help='average number of authors a user follows'
+        )
+        parser.add_argument(
+            '--favorites',
+            type=float,
+            default=DEFAULTS['favorites'],
+            help='average number of favorite recipes of a user'
+        )
+        parser.add_argument(
+            '--carts',
+            type=float,
+            default=DEFAULTS['carts'],
+            help='average number of recipes in a shopping cart'
+        )
+        parser.add_argument(
+            '--zipf',
+            type=float,
+            default=DEFAULTS['zipf'],
+            help='exponent of the Zipf distribution, 0 makes it uniform'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=DEFAULTS['days'],
+            help='recipes are spread over this many last days'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='random seed'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=DEFAULTS['workers'],
+            help='number of parallel processes'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            counts = generate_dataset(
+                options['users'], options['recipes'], options['seed'],
+                **{
+                    option: options[option]
+                    for option in ('follows', 'favorites', 'carts', 'zipf',
+                                   'days', 'workers')
+                }
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Added {counts["users"]} users, {counts["recipes"]} recipes '
+            f'and {counts["relations"]} follows, favorites and cart items '
+            f'in {time.perf_counter() - started:.1f} s. Every user can log '
+            f'in with the password {PASSWORD}, e.g. as {fixture_email(0)}'
+        ))
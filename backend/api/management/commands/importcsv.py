@@ -1,15 +1,68 @@
 import csv
+import json
 import os
 
 from django.apps import apps
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.cache import bump_reference_version
+
+IMPORT_FIELDS = {
+    'ingredient': (('name', 'measurement_unit'), ('name', 'measurement_unit')),
+    'tag': (('name', 'color', 'slug'), ('slug',)),
+}
+JSON_CHUNK_SIZE = 64 * 1024
+JSON_WHITESPACE = ' \t\n\r,'
+
+
+def read_csv(file, fields):
+    for row in csv.reader(file, delimiter=','):
+        if row:
+            yield dict(zip(fields, row))
+
+
+def read_json(file, fields):
+    decoder = json.JSONDecoder()
+    buffer, position = file.read(JSON_CHUNK_SIZE).lstrip(), 1
+    if not buffer.startswith('['):
+        raise CommandError('JSON file must contain a list of objects')
+    while True:
+        while position < len(buffer) and buffer[position] in JSON_WHITESPACE:
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            if position == len(buffer):
+                raise ValueError
+            item, position = decoder.raw_decode(buffer, position)
+        except ValueError:
+            chunk = file.read(JSON_CHUNK_SIZE)
+            if not chunk:
+                raise CommandError('JSON file is truncated or malformed')
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield {field: item[field] for field in fields}
+
+
+def batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 
 class Command(BaseCommand):
     help = (
-        'This command helps you to fill CSV data into db. '
-        'To perform CSV data migration type the following command: '
+        'This command helps you to fill CSV or JSON data into db. '
+        'Existing rows are matched by their unique fields and updated, '
+        'new rows are inserted, nothing is deleted. '
+        'To perform data migration type the following command: '
         '>>> python manage.py importcsv '
         '--filename "<filename>.csv" '
         '--model_name "<model_name>" '
@@ -20,18 +73,24 @@ class Command(BaseCommand):
         parser.add_argument(
             '--filename',
             type=str,
-            help='file name (with ".csv" extension)'
+            help='file name (with ".csv" or ".json" extension)'
         )
         parser.add_argument(
             '--model_name',
             type=str,
-            help='model name that is used with this ".csv" file'
+            help='model name that is used with this file'
         )
         parser.add_argument(
             '--app_name',
             type=str,
             help='django app name'
         )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=1000,
+            help='number of rows written per query'
+        )
 
     def get_csv_file(self, filename):
         file_path = os.path.join(
@@ -41,32 +100,69 @@ class Command(BaseCommand):
         )
         return file_path
 
+    def import_batch(self, model, rows, fields, unique_fields):
+        rows = {
+            tuple(row[field] for field in unique_fields): row for row in rows
+        }
+        existing = {
+            tuple(values[:len(unique_fields)]): values[len(unique_fields):]
+            for values in model.objects.filter(**{
+                f'{field}__in': {key[index] for key in rows}
+                for index, field in enumerate(unique_fields)
+            }).values_list(*unique_fields, *fields).order_by()
+        }
+        changed = [
+            model(**row) for key, row in rows.items()
+            if existing.get(key) != tuple(row[field] for field in fields)
+        ]
+        update_fields = [
+            field for field in fields if field not in unique_fields
+        ]
+        if update_fields:
+            model.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=update_fields
+            )
+        else:
+            model.objects.bulk_create(changed, ignore_conflicts=True)
+        inserted = sum(1 for key in rows if key not in existing)
+        updated = len(changed) - inserted
+        return inserted, updated, len(rows) - len(changed)
+
     def handle(self, *args, **options):
         filename = options['filename']
         app_name = options['app_name']
         model_name = options['model_name']
+        batch_size = options['batch_size']
         file_path = self.get_csv_file(filename)
         self.stdout.write(self.style.SUCCESS(f'Reading: {file_path}'))
         _model = apps.get_model(app_name, model_name)
-        _model.objects.all().delete()
+        if _model._meta.model_name not in IMPORT_FIELDS:
+            raise CommandError(f'Import into {model_name} is not supported')
+        fields, unique_fields = IMPORT_FIELDS[_model._meta.model_name]
+        reader = read_json if filename.endswith('.json') else read_csv
+        counts = [0, 0, 0]
         try:
-            with open(file_path, 'r', encoding='utf-8') as csv_file:
-                reader = csv.reader(csv_file, delimiter=',')
-                bulk_create_data = (
-                    _model(name=row[0], measurement_unit=row[1])
-                    for row in reader
-                )
-                if 'tags.csv' in filename:
-                    bulk_create_data = (
-                        _model(name=row[0], color=row[1], slug=row[2])
-                        for row in reader
+            with open(file_path, 'r', encoding='utf-8') as file, \
+                    transaction.atomic():
+                for batch in batches(reader(file, fields), batch_size):
+                    batch_counts = self.import_batch(
+                        _model, batch, fields, unique_fields
                     )
-                _model.objects.bulk_create(bulk_create_data)
-                line_count = _model.objects.count()
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'{line_count} entries added to {model_name}'
-                )
-            )
+                    counts = [
+                        total + count
+                        for total, count in zip(counts, batch_counts)
+                    ]
+                    self.stdout.write(f'Processed {sum(counts)} rows')
         except FileNotFoundError:
             raise CommandError(f'File {file_path} does not exist')
+        bump_reference_version()
+        inserted, updated, unchanged = counts
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{model_name}: {inserted} inserted, {updated} updated, '
+                f'{unchanged} unchanged'
+            )
+        )
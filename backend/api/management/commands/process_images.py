@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipe.images import (claim_recipe, pending_recipes, process_recipe,
+                           release_recipe)
+
+
+class Command(BaseCommand):
+    help = (
+        'This command generates thumbnails and WebP copies of recipe '
+        'images in the background. Every recipe is claimed with an '
+        'advisory lock, so several workers can run at once and rows are '
+        'not locked while images are encoded: '
+        '>>> python manage.py process_images'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='process pending images and exit'
+        )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=10,
+            help='number of pending recipes looked at in one round'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2,
+            help='seconds to wait when there is nothing to do'
+        )
+
+    def process_batch(self, batch_size):
+        processed = 0
+        for pk in pending_recipes().values_list('pk', flat=True)[:batch_size]:
+            recipe = claim_recipe(pk)
+            if recipe is None:
+                continue
+            try:
+                process_recipe(recipe)
+            finally:
+                release_recipe(pk)
+            error = recipe.image_variants.get('error')
+            if error:
+                self.stderr.write(f'Recipe {recipe.pk}: {error}')
+            processed += 1
+        return processed
+
+    def handle(self, *args, **options):
+        while True:
+            processed = self.process_batch(options['batch_size'])
+            if processed:
+                self.stdout.write(f'Processed {processed} images')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['sleep'])
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipe.models import ShoppingListItem
+from recipe.shopping_list import (calculate_shopping_lists,
+                                  rebuild_shopping_lists)
+
+
+class Command(BaseCommand):
+    help = (
+        'This command rebuilds the shopping list table from carts. '
+        'To check the table for consistency without changing it type: '
+        '>>> python manage.py rebuild_shopping_lists --check'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='only compare the table with carts and report differences'
+        )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=1000,
+            help='number of rows inserted per query'
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            rebuild_shopping_lists(batch_size=options['batch_size'])
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{ShoppingListItem.objects.count()} entries '
+                    'added to ShoppingListItem'
+                )
+            )
+            return
+        expected = calculate_shopping_lists()
+        actual = {
+            (user_id, ingredient_id): total_amount
+            for user_id, ingredient_id, total_amount
+            in ShoppingListItem.objects.values_list(
+                'user_id', 'ingredient_id', 'total_amount'
+            ).iterator()
+        }
+        mismatches = [
+            key for key in expected.keys() | actual.keys()
+            if expected.get(key) != actual.get(key)
+        ]
+        for user_id, ingredient_id in sorted(mismatches):
+            self.stdout.write(
+                f'user {user_id}, ingredient {ingredient_id}: '
+                f'expected {expected.get((user_id, ingredient_id), 0)}, '
+                f'found {actual.get((user_id, ingredient_id), 0)}'
+            )
+        if mismatches:
+            raise CommandError(
+                f'{len(mismatches)} inconsistent entries in '
+                'ShoppingListItem, run without --check to rebuild'
+            )
+        self.stdout.write(self.style.SUCCESS('ShoppingListItem is consistent'))
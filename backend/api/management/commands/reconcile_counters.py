@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipe.counters import COUNTERS, drifted_counters, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'This command recalculates the favorites, carts, recipes and '
+        'followers counters that drifted from the actual rows. '
+        'To only report drifted counters type: '
+        '>>> python manage.py reconcile_counters --check'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='only report counters that differ from the actual rows'
+        )
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for model, counters in COUNTERS.items():
+            name = model._meta.model_name
+            if not options['check']:
+                fixed = reconcile_counters(model)
+                drifted += fixed
+                self.stdout.write(f'{name}: {fixed} rows fixed')
+                continue
+            for row in drifted_counters(model).values(
+                'pk', *counters, *(f'expected_{field}' for field in counters)
+            ).iterator():
+                drifted += 1
+                self.stdout.write(f'{name} {row["pk"]}: ' + ', '.join(
+                    f'{field} expected {row[f"expected_{field}"]}, '
+                    f'found {row[field]}'
+                    for field in counters
+                    if row[field] != row[f'expected_{field}']
+                ))
+        if options['check'] and drifted:
+            raise CommandError(
+                f'{drifted} rows with drifted counters, '
+                'run without --check to fix them'
+            )
+        self.stdout.write(self.style.SUCCESS('Counters are consistent'))
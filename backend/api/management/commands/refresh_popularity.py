@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from recipe.popularity import mark_all_dirty, refresh_popularity
+
+
+class Command(BaseCommand):
+    help = (
+        'This command recalculates popularity scores of recipes that '
+        'were added to or removed from favorites and carts since the '
+        'last run. Run it periodically, e.g. from cron: '
+        '>>> python manage.py refresh_popularity'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='recalculate every recipe, e.g. after changing weights'
+        )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=1000,
+            help='number of recipes locked by one transaction'
+        )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            mark_all_dirty()
+        total = 0
+        while True:
+            refreshed = refresh_popularity(options['batch_size'])
+            if not refreshed:
+                break
+            total += refreshed
+        self.stdout.write(
+            self.style.SUCCESS(f'Popularity refreshed for {total} recipes')
+        )
@@ -0,0 +1,210 @@
+import json
+import os
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmark import (HttpClient, InProcessClient, build_plan, get_pools,
+                           load_collection, run_plan, summarize)
+from ingredient.models import Ingredient
+from recipe.fixtures import fixture_email, generate_dataset
+from recipe.models import Cart, Favorite, IngredientRecipe, Recipe, Tag
+from user.models import Follow, User
+
+COLLECTION = os.path.join(
+    settings.BASE_DIR.parent, 'postman-collection',
+    'diploma.postman_collection.json'
+)
+DATASET_MODELS = (
+    User, Follow, Tag, Ingredient, Recipe, IngredientRecipe, Favorite, Cart
+)
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return os.getenv('GIT_COMMIT')
+
+
+class Command(BaseCommand):
+    help = (
+        'This command replays GET requests of the Postman collection, '
+        'optionally mixed with add/remove pairs for favorites, carts and '
+        'subscriptions, in-process or against a running server, and '
+        'reports latency percentiles, throughput and SQL queries per '
+        'endpoint. Results are saved as JSON to compare commits: '
+        '>>> python manage.py run_benchmark --users 1000 --recipes 10000 '
+        '--output before.json'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collection',
+            default=COLLECTION,
+            help='path to the Postman collection'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=0,
+            help='number of synthetic users to add before the run, see '
+                 'generate_fixtures for larger datasets'
+        )
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=0,
+            help='number of synthetic recipes to add before the run'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='number of measured steps'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=50,
+            help='number of steps run before measuring'
+        )
+        parser.add_argument(
+            '--writes',
+            type=float,
+            default=0,
+            help='share of steps that add and remove a favorite, cart '
+                 'item or subscription'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='random seed of the dataset and the request plan'
+        )
+        parser.add_argument(
+            '--email',
+            default=fixture_email(0),
+            help='user whose token authenticated requests use'
+        )
+        parser.add_argument(
+            '--url',
+            help='base URL of a running server, e.g. http://127.0.0.1:8000; '
+                 'requests run in-process if not set'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='number of parallel clients, only with --url'
+        )
+        parser.add_argument(
+            '--output',
+            help='file to save the results to'
+        )
+        parser.add_argument(
+            '--compare',
+            help='results of a previous run to compare with'
+        )
+
+    def compare(self, path, endpoints):
+        with open(path, encoding='utf-8') as file:
+            previous = json.load(file)
+        self.stdout.write(
+            f'\nCompared with {previous.get("commit")} '
+            f'({previous["started_at"]}):'
+        )
+        for label, result in endpoints.items():
+            before = previous['endpoints'].get(label)
+            if before is None:
+                continue
+            change = (result['p95_ms'] - before['p95_ms']) / before['p95_ms']
+            line = (
+                f'{label}: p95 {before["p95_ms"]} -> {result["p95_ms"]} ms '
+                f'({change:+.0%}), queries {before["queries"]} -> '
+                f'{result["queries"]}'
+            )
+            if change > 0.1 or (result['queries'] or 0) > (
+                before['queries'] or 0
+            ):
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        if options['concurrency'] > 1 and not options['url']:
+            raise CommandError('--concurrency requires --url')
+        if options['users'] or options['recipes']:
+            counts = generate_dataset(
+                options['users'], options['recipes'], options['seed']
+            )
+            self.stdout.write(
+                f'Added {counts["users"]} users and {counts["recipes"]} '
+                'recipes'
+            )
+        user = User.objects.filter(email=options['email']).first()
+        if user is None:
+            raise CommandError(
+                f'User {options["email"]} does not exist, add a dataset '
+                'with --users and --recipes first'
+            )
+        reads, writes = load_collection(options['collection'])
+        rng = random.Random(options['seed'])
+        try:
+            plan = build_plan(
+                reads, writes, get_pools(user),
+                options['warmup'] + options['requests'], options['writes'],
+                rng
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        client = (
+            HttpClient(user, options['url']) if options['url']
+            else InProcessClient(user)
+        )
+        run_plan(client, plan[:options['warmup']], options['concurrency'])
+        started = time.perf_counter()
+        samples = run_plan(
+            client, plan[options['warmup']:], options['concurrency']
+        )
+        duration = time.perf_counter() - started
+        endpoints = summarize(samples, duration)
+        results = {
+            'commit': get_commit(),
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'target': options['url'] or 'in-process',
+            'concurrency': options['concurrency'],
+            'seed': options['seed'],
+            'writes': options['writes'],
+            'dataset': {
+                model._meta.model_name: model.objects.count()
+                for model in DATASET_MODELS
+            },
+            'requests': len(samples),
+            'duration_s': round(duration, 2),
+            'throughput': round(len(samples) / duration, 2),
+            'endpoints': endpoints,
+        }
+        for label, result in endpoints.items():
+            self.stdout.write(
+                f'{label}: {result["requests"]} requests, '
+                f'p50 {result["p50_ms"]} / p95 {result["p95_ms"]} / '
+                f'p99 {result["p99_ms"]} ms, {result["queries"]} queries, '
+                f'statuses {result["statuses"]}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(samples)} requests in {results["duration_s"]} s, '
+            f'{results["throughput"]} requests per second'
+        ))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+        if options['compare']:
+            self.compare(options['compare'], endpoints)
@@ -0,0 +1,12 @@
+from django.db import models
+
+
+class ReferenceVersion(models.Model):
+    version = models.BigIntegerField('Версия', default=0)
+
+    class Meta:
+        verbose_name = 'версия справочников'
+        verbose_name_plural = 'Версии справочников'
+
+    def __str__(self):
+        return str(self.version)
@@ -1,8 +1,141 @@
+import base64
+import json
+
+from django.core.paginator import InvalidPage
+from django.db.models import F, Field, Func, Q, Value
+from django.db.models.lookups import Exact, GreaterThan, LessThan
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 from foodgram.constants import DEFAULT_PAGE_SIZE_PAGINATOR
 
 
+class Row(Func):
+    template = '(%(expressions)s)'
+    output_field = Field()
+
+
 class RecipePaginator(PageNumberPagination):
     page_size = DEFAULT_PAGE_SIZE_PAGINATOR
     page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    cursor_ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+        return self.get_cursor_page(
+            list(self.get_cursor_queryset(queryset, request, view))
+        )
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if self.use_cursor:
+            return self.get_cursor_page([
+                obj async for obj in self.get_cursor_queryset(
+                    queryset, request, view
+                )
+            ])
+        self.request = request
+        paginator = self.django_paginator_class(
+            queryset, self.get_page_size(request)
+        )
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return self.page.object_list
+
+    def get_cursor_queryset(self, queryset, request, view):
+        self.request = request
+        self.ordering = getattr(view, 'cursor_ordering', self.cursor_ordering)
+        self.cursor_page_size = self.get_page_size(request)
+        cursor = request.query_params[self.cursor_query_param]
+        if cursor:
+            queryset = queryset.filter(
+                self.get_cursor_filter(self.decode_cursor(cursor, queryset))
+            )
+        return queryset.order_by(*self.ordering)[:self.cursor_page_size + 1]
+
+    def get_cursor_page(self, page):
+        self.next_cursor = None
+        if len(page) > self.cursor_page_size:
+            page = page[:self.cursor_page_size]
+            self.next_cursor = self.encode_cursor(page[-1])
+        return page
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if self.next_cursor is None:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url, self.cursor_query_param, self.next_cursor
+        )
+
+    def get_field_names(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def get_field(self, queryset, name):
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return queryset.model._meta.get_field(name)
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, name) for name in self.get_field_names()]
+        data = json.dumps(values, default=str).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, cursor, queryset):
+        names = self.get_field_names()
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(names):
+                raise ValueError
+            return [
+                (field, field.to_python(value))
+                for field, value in zip(
+                    (self.get_field(queryset, name) for name in names), values
+                )
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_cursor_filter(self, values):
+        runs = []
+        for ordering, (field, value) in zip(self.ordering, values):
+            descending = ordering.startswith('-')
+            if not runs or runs[-1][0] != descending:
+                runs.append((descending, [], []))
+            runs[-1][1].append(F(ordering.lstrip('-')))
+            runs[-1][2].append(Value(value, output_field=field))
+        condition = None
+        for descending, names, values in reversed(runs):
+            lookup = LessThan if descending else GreaterThan
+            after = lookup(Row(*names), Row(*values))
+            if condition is not None:
+                after = Q(after) | Q(Exact(Row(*names), Row(*values))) & Q(
+                    condition
+                )
+            condition = after
+        return condition
@@ -1,13 +1,15 @@
-import base64
-import io
-
-from drf_extra_fields.fields import Base64ImageField
-from PIL import Image
+from django.db import transaction
 from rest_framework import serializers
 
+from api.fields import PrimaryKeyListField, StreamingBase64ImageField
+from foodgram import constants
 from ingredient.models import Ingredient
-from recipe.models import Cart, Favorite, IngredientRecipe, Recipe, Tag
-from user.serializers import UserRecipeSerializer, UserSerializer
+from recipe import shopping_list
+from recipe.counters import change_counter
+from recipe.models import IngredientRecipe, Recipe, Tag
+from recipe.search import update_search_fields
+from user.models import User
+from user.serializers import RecipeImageSerializer, UserSerializer
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -34,7 +36,7 @@ class TagSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'color', 'slug')
 
 
-class RecipeSerializerRead(serializers.ModelSerializer):
+class RecipeSerializerRead(RecipeImageSerializer):
     ingredients = IngredientRecipeSerializer(
         source='ingredient_recipes', many=True
     )
@@ -49,6 +51,8 @@ class RecipeSerializerRead(serializers.ModelSerializer):
         fields = (
             'id',
             'image',
+            'image_thumb',
+            'image_srcset',
             'name',
             'author',
             'text',
@@ -60,21 +64,36 @@ class RecipeSerializerRead(serializers.ModelSerializer):
         )
 
     def get_is_favorited(self, obj):
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         user = self.context.get('request').user
         return user.is_authenticated and user.favorites.filter(
             recipe=obj
         ).exists()
 
     def get_is_in_shopping_cart(self, obj):
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         user = self.context.get('request').user
         return user.is_authenticated and user.carts.filter(recipe=obj).exists()
 
 
+class CookableRecipeSerializer(RecipeSerializerRead):
+    ingredients_covered = serializers.IntegerField(read_only=True)
+    ingredients_missing = serializers.SerializerMethodField(read_only=True)
+
+    class Meta(RecipeSerializerRead.Meta):
+        fields = RecipeSerializerRead.Meta.fields + (
+            'ingredients_covered',
+            'ingredients_missing'
+        )
+
+    def get_ingredients_missing(self, obj):
+        return obj.ingredients_total - obj.ingredients_covered
+
+
 class AddIngredientRecipeSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        source='ingredient',
-        queryset=Ingredient.objects.all()
-    )
+    id = serializers.IntegerField(min_value=1)
     recipe = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
@@ -84,10 +103,13 @@ class AddIngredientRecipeSerializer(serializers.ModelSerializer):
 
 class RecipeSerializerRecord(serializers.ModelSerializer):
     ingredients = AddIngredientRecipeSerializer(many=True, required=True)
-    tags = serializers.PrimaryKeyRelatedField(
-        many=True, queryset=Tag.objects.all(), required=True
+    tags = PrimaryKeyListField(
+        queryset=Tag.objects.all(), deduplicate=False, required=True,
+        error_messages={
+            'does_not_exist': 'Тегов с id {pk_values} не существует'
+        }
     )
-    image = Base64ImageField(max_length=None)
+    image = StreamingBase64ImageField(max_length=None)
 
     class Meta:
         model = Recipe
@@ -101,6 +123,19 @@ class RecipeSerializerRecord(serializers.ModelSerializer):
             'ingredients'
         )
 
+    def validate_ingredients(self, ingredients):
+        pk_values = [ingredient.pop('id') for ingredient in ingredients]
+        objects = Ingredient.objects.in_bulk(pk_values)
+        missing = [pk for pk in dict.fromkeys(pk_values) if pk not in objects]
+        if missing:
+            raise serializers.ValidationError(
+                f'Ингредиентов с id {", ".join(map(str, missing))} '
+                'не существует'
+            )
+        for ingredient, pk in zip(ingredients, pk_values):
+            ingredient['ingredient'] = objects[pk]
+        return ingredients
+
     def validate(self, data):
         ingredients = data.get('ingredients')
         tags = data.get('tags')
@@ -109,25 +144,27 @@ class RecipeSerializerRecord(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 'Вы не выбрали картинку'
             )
-        if not tags:
-            raise serializers.ValidationError(
-                'Вы не выбрали теги'
-            )
-        if len(tags) != len(set(tags)):
-            raise serializers.ValidationError(
-                'Проверьте, какой-то тег был выбран более 1 раза'
-            )
-        if not ingredients:
-            raise serializers.ValidationError(
-                'Вы не выбрали ингредиенты'
-            )
-        ingredients_list = [
-            ingredient['ingredient'].id for ingredient in ingredients
-        ]
-        if len(ingredients_list) != len(set(ingredients_list)):
-            raise serializers.ValidationError(
-                'Проверьте, какой-то ингредиент был выбран более 1 раза'
-            )
+        if not self.partial or 'tags' in data:
+            if not tags:
+                raise serializers.ValidationError(
+                    'Вы не выбрали теги'
+                )
+            if len(tags) != len(set(tags)):
+                raise serializers.ValidationError(
+                    'Проверьте, какой-то тег был выбран более 1 раза'
+                )
+        if not self.partial or 'ingredients' in data:
+            if not ingredients:
+                raise serializers.ValidationError(
+                    'Вы не выбрали ингредиенты'
+                )
+            ingredients_list = [
+                ingredient['ingredient'].id for ingredient in ingredients
+            ]
+            if len(ingredients_list) != len(set(ingredients_list)):
+                raise serializers.ValidationError(
+                    'Проверьте, какой-то ингредиент был выбран более 1 раза'
+                )
         return data
 
     def to_representation(self, instance):
@@ -135,6 +172,14 @@ class RecipeSerializerRecord(serializers.ModelSerializer):
         serializers = RecipeSerializerRead(instance, context=context)
         return serializers.data
 
+    def save(self, **kwargs):
+        try:
+            return super().save(**kwargs)
+        finally:
+            image = self.validated_data.get('image')
+            if image:
+                image.close()
+
     def create_ingredients(self, recipe, ingredients):
         all_ingredients = [
             IngredientRecipe(
@@ -144,15 +189,7 @@ class RecipeSerializerRecord(serializers.ModelSerializer):
             )for ingredient in ingredients]
         IngredientRecipe.objects.bulk_create(all_ingredients)
 
-    def decode_design_image(self, data):
-        try:
-            data = base64.b64decode(data.encode('UTF-8'))
-            buf = io.BytesIO(data)
-            img = Image.open(buf)
-            return img
-        except Exception:
-            return None
-
+    @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
@@ -160,58 +197,88 @@ class RecipeSerializerRecord(serializers.ModelSerializer):
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
         self.create_ingredients(recipe=recipe, ingredients=ingredients)
+        update_search_fields([recipe.pk])
+        change_counter(User, recipe.author_id, 'recipes_count', 1)
         return recipe
 
-    def update(self, instance, validated_data):
-        tags = validated_data.pop('tags')
-        ingredients = validated_data.pop('ingredients')
-        instance.tags.set(tags)
-        IngredientRecipe.objects.filter(recipe=instance).delete()
-        self.create_ingredients(recipe=instance, ingredients=ingredients)
-        return super().update(instance, validated_data)
-
-
-class CartSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Cart
-        fields = (
-            'author',
-            'recipe'
+    def update_tags(self, recipe, tags):
+        through = Recipe.tags.through
+        old_ids = set(
+            through.objects.filter(recipe=recipe).values_list(
+                'tag_id', flat=True
+            )
+        )
+        new_ids = {tag.id for tag in tags}
+        if old_ids - new_ids:
+            through.objects.filter(
+                recipe=recipe, tag_id__in=old_ids - new_ids
+            ).delete()
+        through.objects.bulk_create(
+            through(recipe=recipe, tag_id=tag_id)
+            for tag_id in new_ids - old_ids
         )
 
-    def to_representation(self, cart):
-        recipe = cart.recipe
-        serializers = UserRecipeSerializer(recipe, context=self.context)
-        return serializers.data
-
-    def validate(self, data):
-        user = data.get('author')
-        recipe = data.get('recipe')
-        if user.carts.filter(recipe=recipe).exists():
-            raise serializers.ValidationError(
-                'Рецепт уже добавлен!'
+    def update_ingredients(self, recipe, ingredients):
+        old_items, old_amounts, stale = {}, {}, []
+        for item in IngredientRecipe.objects.filter(recipe=recipe):
+            old_amounts[item.ingredient_id] = (
+                old_amounts.get(item.ingredient_id, 0) + item.amount
             )
-        return data
+            if item.ingredient_id in old_items:
+                stale.append(item.pk)
+            else:
+                old_items[item.ingredient_id] = item
+        new_amounts = {
+            ingredient['ingredient'].id: ingredient['amount']
+            for ingredient in ingredients
+        }
+        stale += [
+            item.pk for ingredient_id, item in old_items.items()
+            if ingredient_id not in new_amounts
+        ]
+        if stale:
+            IngredientRecipe.objects.filter(pk__in=stale).delete()
+        changed = []
+        for ingredient_id, item in old_items.items():
+            amount = new_amounts.get(ingredient_id)
+            if amount is not None and amount != item.amount:
+                item.amount = amount
+                changed.append(item)
+        IngredientRecipe.objects.bulk_update(changed, ['amount'])
+        self.create_ingredients(recipe=recipe, ingredients=[
+            ingredient for ingredient in ingredients
+            if ingredient['ingredient'].id not in old_items
+        ])
+        shopping_list.change_recipe(recipe, old_amounts, new_amounts)
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        tags = validated_data.pop('tags', None)
+        ingredients = validated_data.pop('ingredients', None)
+        if tags is not None:
+            self.update_tags(instance, tags)
+        if ingredients is not None:
+            self.update_ingredients(instance, ingredients)
+        recipe = super().update(instance, validated_data)
+        if ingredients is not None or validated_data.keys() & {'name', 'text'}:
+            update_search_fields([recipe.pk])
+        return recipe
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Favorite
-        fields = (
-            'author',
-            'recipe'
-        )
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False, max_length=constants.BULK_MAX_IDS
+    )
 
-    def to_representation(self, favorite):
-        recipe = favorite.recipe
-        serializers = UserRecipeSerializer(recipe, context=self.context)
-        return serializers.data
 
-    def validate(self, data):
-        user = data.get('author')
-        recipe = data.get('recipe')
-        if user.favorites.filter(recipe=recipe).exists():
-            raise serializers.ValidationError(
-                'Рецепт уже добавлен!'
-            )
-        return data
+class BulkRecipesSerializer(serializers.Serializer):
+    recipes = PrimaryKeyListField(
+        queryset=Recipe.objects.only(
+            'id', 'image', 'image_variants', 'name', 'cooking_time'
+        ),
+        allow_empty=False, max_length=constants.BULK_MAX_IDS,
+        error_messages={
+            'does_not_exist': 'Рецептов с id {pk_values} не существует'
+        }
+    )
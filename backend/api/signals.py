@@ -0,0 +1,61 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from api.cache import bump_reference_version
+from ingredient.models import Ingredient
+from recipe import shopping_list
+from recipe.counters import change_counter, change_counters
+from recipe.models import Recipe, Tag
+from recipe.search import update_search_fields
+from user.models import User
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def reference_data_changed(sender, **kwargs):
+    transaction.on_commit(bump_reference_version)
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_deleting(sender, instance, **kwargs):
+    shopping_list.change_recipe(
+        instance, shopping_list.get_recipe_amounts(instance), {}
+    )
+    change_counter(User, instance.author_id, 'recipes_count', -1)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    for field, relation in (
+        ('favorites_count', 'favorites__author'),
+        ('carts_count', 'carts__author'),
+    ):
+        change_counters(
+            Recipe.objects.filter(**{relation: instance}), field, -1,
+            popularity_dirty=True
+        )
+    change_counters(
+        User.objects.filter(following__following=instance),
+        'followers_count', -1
+    )
+
+
+@receiver(post_delete, sender=Ingredient)
+def ingredient_deleted(sender, instance, **kwargs):
+    update_search_fields(
+        Recipe.objects.filter(ingredient_ids__contains=[instance.pk]).values(
+            'pk'
+        )
+    )
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_saved(sender, instance, **kwargs):
+    update_search_fields(
+        Recipe.objects.filter(
+            ingredient_recipes__ingredient=instance
+        ).values('pk')
+    )
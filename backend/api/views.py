@@ -1,88 +1,276 @@
-from io import BytesIO
-
-from django.db.models import Sum
-from django.http import FileResponse
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Prefetch, Value
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.status import (HTTP_201_CREATED, HTTP_204_NO_CONTENT,
-                                   HTTP_400_BAD_REQUEST)
+                                   HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND)
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
-from api.filters import IngredientFilter, RecipeFilter
-from api.permissions import IsAuthorOrReadOnlyPermission
+from api.async_views import AsyncReadMixin
+from api.cache import ReferenceCacheMixin
+from api.exporters import EXPORTERS, aexport, export
+from api.filters import RECIPE_ORDERINGS, IngredientFilter, RecipeFilter
+from api.ingredient_search import ingredient_index
+from api.negotiation import IgnoreFormatContentNegotiation
 from api.paginator import RecipePaginator
-from api.serializers import (CartSerializer, FavoriteSerializer,
-                             IngredientSerializer, RecipeSerializerRead,
-                             RecipeSerializerRecord, TagSerializer)
+from api.permissions import IsAuthorOrReadOnlyPermission
+from api.serializers import (BulkRecipesSerializer, CookableRecipeSerializer,
+                             IngredientSerializer, RecipeIdsSerializer,
+                             RecipeSerializerRead, RecipeSerializerRecord,
+                             TagSerializer)
+from foodgram.constants import SHOPPING_LIST_CHUNK_SIZE
 from ingredient.models import Ingredient
-from recipe.models import Cart, Favorite, IngredientRecipe, Recipe, Tag
+from recipe import shopping_list
+from recipe.counters import change_counter, recount_counters
+from recipe.models import (Cart, Favorite, IngredientRecipe, Recipe,
+                           ShoppingListItem, Tag)
+from recipe.relations import (add_relation, add_relations, delete_relation,
+                              delete_relations, parse_id)
+from recipe.search import COOKABLE_ORDERING, SEARCH_ORDERING, cookable_recipes
+from user.models import Follow, User
+from user.serializers import UserRecipeSerializer
 
+RECIPE_SHORT_FIELDS = ('id', 'image', 'image_variants', 'name', 'cooking_time')
 
-class RecipeView(ModelViewSet):
-    queryset = Recipe.objects.prefetch_related('tags', 'author')
+
+class RecipeView(AsyncReadMixin, ModelViewSet):
+    queryset = Recipe.objects.prefetch_related(
+        'tags',
+        Prefetch(
+            'ingredient_recipes',
+            queryset=IngredientRecipe.objects.select_related('ingredient')
+        )
+    )
     pagination_class = RecipePaginator
     filter_backends = [DjangoFilterBackend]
     filterset_class = RecipeFilter
     permission_classes = [IsAuthorOrReadOnlyPermission]
+    parser_classes = [JSONParser, MultiPartParser, FormParser]
+
+    @property
+    def cursor_ordering(self):
+        params = self.request.query_params
+        if self.action == 'cookable':
+            return COOKABLE_ORDERING
+        if params.get('ordering') in RECIPE_ORDERINGS:
+            return RECIPE_ORDERINGS[params['ordering']]
+        if params.get('search'):
+            return SEARCH_ORDERING
+        return RecipePaginator.cursor_ordering
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset.select_related('author').annotate(
+                is_favorited=Value(False),
+                is_in_shopping_cart=Value(False)
+            )
+        authors = User.objects.annotate(
+            is_subscribed=Exists(
+                Follow.objects.filter(user=OuterRef('pk'), following=user)
+            )
+        )
+        return queryset.prefetch_related(
+            Prefetch('author', queryset=authors)
+        ).annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(author=user, recipe=OuterRef('pk'))
+            ),
+            is_in_shopping_cart=Exists(
+                Cart.objects.filter(author=user, recipe=OuterRef('pk'))
+            )
+        )
 
     def get_serializer_class(self):
+        if self.action == 'cookable':
+            return CookableRecipeSerializer
         if self.request.method in SAFE_METHODS:
             return RecipeSerializerRead
         return RecipeSerializerRecord
 
-    def adding_method(self, serializer, context):
-        user = context['request'].user
-        data = {'author': user.id, 'recipe': context['pk']}
-        serializer = serializer(data=data, context=context)
-        serializer.is_valid(raise_exception=True)
+    def perform_create(self, serializer):
+        serializer.save()
+        serializer.instance = self.get_queryset().get(
+            pk=serializer.instance.pk
+        )
+
+    def perform_update(self, serializer):
         serializer.save()
+        serializer.instance = self.get_queryset().get(
+            pk=serializer.instance.pk
+        )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
+    @transaction.atomic
+    def adding_method(self, request, pk, model, counter):
+        recipe, created = None, False
+        recipe_id = parse_id(pk)
+        if recipe_id is not None:
+            recipe, created = add_relation(
+                model, 'author', request.user.id, 'recipe', recipe_id,
+                RECIPE_SHORT_FIELDS, created_at=timezone.now()
+            )
+        if recipe is None:
+            return Response(
+                {'error': f'Рецепта с id {pk} не существует'},
+                status=HTTP_400_BAD_REQUEST
+            )
+        if not created:
+            return Response(
+                {'error': 'Рецепт уже добавлен!'},
+                status=HTTP_400_BAD_REQUEST
+            )
+        change_counter(Recipe, recipe.id, counter, 1, popularity_dirty=True)
+        serializer = UserRecipeSerializer(
+            recipe, context={'request': request}
+        )
         return Response(serializer.data, status=HTTP_201_CREATED)
 
-    def delete_method(self, model, user, pk):
-        obj = model.objects.filter(author=user, recipe__id=pk)
-        if obj.exists():
-            obj.delete()
-            return Response(status=HTTP_204_NO_CONTENT)
-        return Response(
-            {'error': 'Рецепта нету в списке'},
-            status=HTTP_400_BAD_REQUEST
+    @transaction.atomic
+    def delete_method(self, request, pk, model, counter):
+        exists = deleted = False
+        recipe_id = parse_id(pk)
+        if recipe_id is not None:
+            exists, deleted = delete_relation(
+                model, 'author', request.user.id, 'recipe', recipe_id
+            )
+        if not exists:
+            return Response(
+                {'error': f'Рецепта с id {pk} не существует'},
+                status=HTTP_404_NOT_FOUND
+            )
+        if not deleted:
+            return Response(
+                {'error': 'Рецепта нету в списке'},
+                status=HTTP_400_BAD_REQUEST
+            )
+        change_counter(
+            Recipe, recipe_id, counter, -1, popularity_dirty=True
+        )
+        return Response(status=HTTP_204_NO_CONTENT)
+
+    @transaction.atomic
+    def bulk_adding_method(self, request, model, counter):
+        serializer = BulkRecipesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipes = serializer.validated_data['recipes']
+        added = add_relations(
+            model, 'author', request.user.id,
+            'recipe', [recipe.id for recipe in recipes],
+            created_at=timezone.now()
         )
+        if added:
+            recount_counters(Recipe, added, counter, popularity_dirty=True)
+        serializer = UserRecipeSerializer(
+            recipes, many=True, context={'request': request}
+        )
+        return Response(serializer.data, status=HTTP_201_CREATED), added
 
-    def encode_cart(self, data):
-        output = ''
-        number = 0
-        for ordered_dict in data:
-            name = ordered_dict['ingredient__name']
-            amount = ordered_dict['amount']
-            measurement_unit = ordered_dict['ingredient__measurement_unit']
-            number += 1
-            output += f'{number}. {name} {amount} {measurement_unit}\n'
-        return output
+    @transaction.atomic
+    def bulk_delete_method(self, request, model, counter):
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        deleted = delete_relations(
+            model, 'author', request.user.id,
+            'recipe', serializer.validated_data['recipes']
+        )
+        if deleted:
+            recount_counters(Recipe, deleted, counter, popularity_dirty=True)
+        return Response(status=HTTP_204_NO_CONTENT), deleted
 
     @action(
         detail=False,
         methods=['GET'],
-        permission_classes=[IsAuthenticated, ]
+        permission_classes=[IsAuthenticated, ],
+        content_negotiation_class=IgnoreFormatContentNegotiation
     )
     def download_shopping_cart(self, request):
-        shopping_list = IngredientRecipe.objects.filter(
-            recipe__carts__author=request.user
-        ).values(
-            'ingredient__name',
-            'ingredient__measurement_unit'
-        ).annotate(amount=Sum('amount'))
-        if not shopping_list.exists():
+        file_format = request.query_params.get('format', 'txt')
+        if file_format not in EXPORTERS:
+            return Response(
+                {'error': f'Формат {file_format} не поддерживается'},
+                status=HTTP_400_BAD_REQUEST
+            )
+        items = self.get_shopping_list(request.user)
+        if not items.exists():
             return Response(
                 {'error': 'В карзине нет рецептов!'},
                 status=HTTP_400_BAD_REQUEST
             )
-        output = self.encode_cart(shopping_list)
-        buffer = BytesIO(output.encode('utf8'))
-        return FileResponse(
-            buffer, filename='shopping_list.txt', as_attachment=True
+        exporter, content_type = EXPORTERS[file_format]
+        return self.get_shopping_list_response(
+            file_format, content_type, export(
+                exporter, items.iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
+            )
+        )
+
+    async def adownload_shopping_cart(self, request):
+        file_format = request.query_params.get('format', 'txt')
+        if file_format not in EXPORTERS:
+            return Response(
+                {'error': f'Формат {file_format} не поддерживается'},
+                status=HTTP_400_BAD_REQUEST
+            )
+        items = self.get_shopping_list(request.user)
+        if not await items.aexists():
+            return Response(
+                {'error': 'В карзине нет рецептов!'},
+                status=HTTP_400_BAD_REQUEST
+            )
+        exporter, content_type = EXPORTERS[file_format]
+        return self.get_shopping_list_response(
+            file_format, content_type, aexport(
+                exporter, items.aiterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
+            )
+        )
+
+    def get_shopping_list(self, user):
+        return ShoppingListItem.objects.filter(user=user).values(
+            'ingredient__name',
+            'ingredient__measurement_unit',
+            amount=F('total_amount')
+        ).order_by('ingredient__name')
+
+    def get_shopping_list_response(self, file_format, content_type, content):
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="shopping_list.{file_format}"'
+        )
+        return response
+
+    @action(detail=False, methods=['GET'])
+    def cookable(self, request):
+        ingredient_ids = request.query_params.getlist('ingredients')
+        if not ingredient_ids:
+            return Response(
+                {'error': 'Вы не выбрали ингредиенты'},
+                status=HTTP_400_BAD_REQUEST
+            )
+        ingredient_ids = {parse_id(value) for value in ingredient_ids}
+        if None in ingredient_ids:
+            return Response(
+                {'error': 'Неверный id ингредиента'},
+                status=HTTP_400_BAD_REQUEST
+            )
+        full = request.query_params.get('full', '').lower() in ('1', 'true')
+        recipes = cookable_recipes(
+            self.filter_queryset(self.get_queryset()),
+            sorted(ingredient_ids),
+            full
         )
+        page = self.paginate_queryset(recipes)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(
         detail=True,
@@ -90,11 +278,9 @@ class RecipeView(ModelViewSet):
         permission_classes=[IsAuthenticated, ]
     )
     def favorite(self, request, pk):
-        user = request.user
-        context = {'request': request, 'pk': pk}
         if request.method == 'POST':
-            return self.adding_method(FavoriteSerializer, context)
-        return self.delete_method(Favorite, user, pk)
+            return self.adding_method(request, pk, Favorite, 'favorites_count')
+        return self.delete_method(request, pk, Favorite, 'favorites_count')
 
     @action(
         detail=True,
@@ -102,19 +288,80 @@ class RecipeView(ModelViewSet):
         permission_classes=[IsAuthenticated, ]
     )
     def shopping_cart(self, request, pk):
-        user = request.user
-        context = {'request': request, 'pk': pk}
+        with transaction.atomic():
+            if request.method == 'POST':
+                response = self.adding_method(
+                    request, pk, Cart, 'carts_count'
+                )
+                if response.status_code == HTTP_201_CREATED:
+                    shopping_list.add_recipe(request.user, pk)
+                return response
+            response = self.delete_method(request, pk, Cart, 'carts_count')
+            if response.status_code == HTTP_204_NO_CONTENT:
+                shopping_list.remove_recipe(request.user, pk)
+        return response
+
+    @action(
+        detail=False,
+        methods=['POST', 'DELETE'],
+        url_path='favorite',
+        permission_classes=[IsAuthenticated, ]
+    )
+    def bulk_favorite(self, request):
         if request.method == 'POST':
-            return self.adding_method(CartSerializer, context)
-        return self.delete_method(Cart, user, pk)
+            response, _ = self.bulk_adding_method(
+                request, Favorite, 'favorites_count'
+            )
+        else:
+            response, _ = self.bulk_delete_method(
+                request, Favorite, 'favorites_count'
+            )
+        return response
+
+    @action(
+        detail=False,
+        methods=['POST', 'DELETE'],
+        url_path='shopping_cart',
+        permission_classes=[IsAuthenticated, ]
+    )
+    def bulk_shopping_cart(self, request):
+        with transaction.atomic():
+            if request.method == 'POST':
+                response, added = self.bulk_adding_method(
+                    request, Cart, 'carts_count'
+                )
+                shopping_list.add_recipes(request.user, added)
+            else:
+                response, deleted = self.bulk_delete_method(
+                    request, Cart, 'carts_count'
+                )
+                shopping_list.remove_recipes(request.user, deleted)
+        return response
 
 
-class TagView(ReadOnlyModelViewSet):
+class TagView(ReferenceCacheMixin, AsyncReadMixin, ReadOnlyModelViewSet):
     serializer_class = TagSerializer
     queryset = Tag.objects.all()
 
 
-class IngredientView(ReadOnlyModelViewSet):
+class IngredientView(ReferenceCacheMixin, AsyncReadMixin,
+                     ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filterset_class = IngredientFilter
+
+    def get_list_response(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name:
+            return super().get_list_response(request, *args, **kwargs)
+        return Response(ingredient_index.search(
+            name, request.query_params.get('measurement_unit')
+        ))
+
+    async def aget_list_response(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name:
+            return await super().aget_list_response(request, *args, **kwargs)
+        return Response(await sync_to_async(ingredient_index.search)(
+            name, request.query_params.get('measurement_unit')
+        ))
@@ -7,3 +7,19 @@ DEFAULT_PAGE_SIZE_PAGINATOR = 1
 RECIPES_LIMIT_DEFOLT = 1
 RESTRICTION_STRING = 30
 MINIMUM_AMOUNT_INGREDIENTS = 1
+SHOPPING_LIST_CHUNK_SIZE = 2000
+SHOPPING_LIST_PDF_LINES_PER_PAGE = 50
+IMAGE_THUMBNAIL_SIZE = (160, 120)
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_MAX_SIZE = 20 * 1024 * 1024
+IMAGE_MAX_DIMENSION = 8000
+IMAGE_DECODE_CHUNK_SIZE = 64 * 1024
+POPULARITY_EPOCH = 1704067200
+POPULARITY_HALF_LIFE = 30 * 24 * 60 * 60
+TRENDING_HALF_LIFE = 3 * 24 * 60 * 60
+POPULARITY_FAVORITE_WEIGHT = 1
+POPULARITY_CART_WEIGHT = 2
+SEARCH_CONFIG = 'russian'
+BULK_MAX_IDS = 100
+MAX_ID = 2 ** 63 - 1
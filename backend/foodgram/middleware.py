@@ -0,0 +1,171 @@
+import json
+import logging
+import random
+import time
+
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger('foodgram.metrics')
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0
+        self.view_started = None
+        self.view_db_time = 0
+        self.view_time = 0
+        self.render_started = None
+        self.render_time = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+    def start_view(self):
+        self.view_started = time.perf_counter()
+        self.view_db_time = self.db_time
+
+    def finish_view(self):
+        if self.view_started is None:
+            return
+        self.view_time = (
+            time.perf_counter() - self.view_started
+            - (self.db_time - self.view_db_time)
+        )
+        self.view_started = None
+
+    def start_render(self):
+        self.finish_view()
+        self.render_started = time.perf_counter()
+
+    def finish_render(self, response):
+        self.render_time = time.perf_counter() - self.render_started
+
+    def as_dict(self, request, response, size):
+        total = time.perf_counter() - self.started
+        return {
+            'method': request.method,
+            'path': request.path,
+            'view': get_view_name(request),
+            'status': response.status_code,
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'view_ms': round(self.view_time * 1000, 2),
+            'render_ms': round(self.render_time * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+            'size': size,
+        }
+
+
+def get_view_name(request):
+    match = request.resolver_match
+    if match is None:
+        return None
+    view = match.func
+    view_class = getattr(view, 'cls', getattr(view, 'view_class', None))
+    if view_class is None:
+        return match.view_name
+    action = getattr(view, 'actions', {}).get(request.method.lower())
+    if action is None:
+        return view_class.__name__
+    return f'{view_class.__name__}.{action}'
+
+
+def add_execute_wrapper(wrapper):
+    connection.execute_wrappers.append(wrapper)
+
+
+def remove_execute_wrapper(wrapper):
+    connection.execute_wrappers.remove(wrapper)
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= settings.REQUEST_METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+        metrics = request.metrics = RequestMetrics()
+        with connection.execute_wrapper(metrics):
+            response = self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if random.random() >= settings.REQUEST_METRICS_SAMPLE_RATE:
+            return await self.get_response(request)
+        metrics = request.metrics = RequestMetrics()
+        await sync_to_async(add_execute_wrapper)(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(remove_execute_wrapper)(metrics)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        metrics.finish_view()
+        if response.streaming:
+            stream = self.astream if response.is_async else self.stream
+            response.streaming_content = stream(
+                request, response, response.streaming_content, metrics
+            )
+            return response
+        data = metrics.as_dict(request, response, len(response.content))
+        response['Server-Timing'] = (
+            f'db;dur={data["db_ms"]};desc="{data["queries"]} queries", '
+            f'view;dur={data["view_ms"]};desc="view without SQL", '
+            f'render;dur={data["render_ms"]}, total;dur={data["total_ms"]}'
+        )
+        logger.info(json.dumps(data))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = getattr(request, 'metrics', None)
+        if metrics is not None:
+            metrics.start_view()
+
+    def process_template_response(self, request, response):
+        metrics = getattr(request, 'metrics', None)
+        if metrics is not None:
+            metrics.start_render()
+            response.add_post_render_callback(metrics.finish_render)
+        return response
+
+    def stream(self, request, response, content, metrics):
+        size = 0
+        with connection.execute_wrapper(metrics):
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        logger.info(json.dumps(metrics.as_dict(request, response, size)))
+
+    async def astream(self, request, response, content, metrics):
+        size = 0
+        await sync_to_async(add_execute_wrapper)(metrics)
+        try:
+            async for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            await sync_to_async(remove_execute_wrapper)(metrics)
+        logger.info(json.dumps(metrics.as_dict(request, response, size)))
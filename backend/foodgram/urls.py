@@ -1,4 +1,3 @@
-import debug_toolbar
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
@@ -11,6 +10,8 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
+    import debug_toolbar
+
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
     urlpatterns += static(settings.MEDIA_URL,
                           document_root=settings.MEDIA_ROOT)
@@ -1,7 +1,12 @@
+from collections import defaultdict
+
 from django.contrib import admin
 
 from ingredient.models import Ingredient
+from recipe import shopping_list
+from recipe.admin import TrackedRowsAdminMixin
 from recipe.models import IngredientRecipe
+from recipe.search import update_search_fields
 
 
 @admin.register(Ingredient)
@@ -15,8 +20,21 @@ class IngredientAdmin(admin.ModelAdmin):
 
 
 @admin.register(IngredientRecipe)
-class IngredientRecipeAdmin(admin.ModelAdmin):
+class IngredientRecipeAdmin(TrackedRowsAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'recipe', 'ingredient', 'amount')
     search_fields = ('recipe__name', 'ingredient__name',)
     list_filter = ('recipe', 'ingredient',)
     empty_value_display = 'не задано'
+    tracked_fields = ('recipe_id', 'ingredient_id', 'amount')
+
+    def rows_changed(self, old_rows, new_rows):
+        amounts = defaultdict(lambda: ({}, {}))
+        for index, rows in enumerate((old_rows, new_rows)):
+            for recipe_id, ingredient_id, amount in rows:
+                recipe_amounts = amounts[recipe_id][index]
+                recipe_amounts[ingredient_id] = (
+                    recipe_amounts.get(ingredient_id, 0) + amount
+                )
+        for recipe_id, (old_amounts, new_amounts) in amounts.items():
+            shopping_list.change_recipe(recipe_id, old_amounts, new_amounts)
+        update_search_fields(list(amounts))
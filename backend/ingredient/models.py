@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from foodgram import constants
 
@@ -19,6 +21,12 @@ class Ingredient(models.Model):
             models.UniqueConstraint(fields=['name', 'measurement_unit'],
                                     name='unique_name_measurement_unit')
         ]
+        indexes = [
+            models.Index(
+                OpClass(Upper('name'), name='text_pattern_ops'),
+                name='ingredient_name_upper_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name[:constants.RESTRICTION_STRING]
@@ -1,16 +1,64 @@
 from django.contrib import admin
+from django.db.models import Q
 from django.utils.safestring import mark_safe
 
-from recipe.models import Cart, Favorite, IngredientRecipe, Recipe, Tag
+from recipe import shopping_list
+from recipe.counters import recount_counters
+from recipe.images import variants_ready
+from recipe.models import (Cart, Favorite, IngredientRecipe, Recipe,
+                           ShoppingListItem, Tag)
+from recipe.search import recipe_search_query, update_search_fields
+from user.models import User
+
+
+class TrackedRowsAdminMixin:
+    tracked_fields = ()
+
+    def get_row(self, obj):
+        return tuple(getattr(obj, field) for field in self.tracked_fields)
+
+    def get_rows(self, queryset):
+        return list(queryset.values_list(*self.tracked_fields))
+
+    def rows_changed(self, old_rows, new_rows):
+        raise NotImplementedError
+
+    def save_model(self, request, obj, form, change):
+        old_rows = (
+            self.get_rows(self.model.objects.filter(pk=obj.pk))
+            if change else []
+        )
+        super().save_model(request, obj, form, change)
+        self.rows_changed(old_rows, [self.get_row(obj)])
+
+    def delete_model(self, request, obj):
+        old_rows = [self.get_row(obj)]
+        super().delete_model(request, obj)
+        self.rows_changed(old_rows, [])
+
+    def delete_queryset(self, request, queryset):
+        old_rows = self.get_rows(queryset)
+        super().delete_queryset(request, queryset)
+        self.rows_changed(old_rows, [])
+
+
+class CounterAdminMixin(TrackedRowsAdminMixin):
+    tracked_fields = ('author_id', 'recipe_id')
+    counter_model = Recipe
+    counter_field = None
+    counter_values = {'popularity_dirty': True}
+
+    def rows_changed(self, old_rows, new_rows):
+        recount_counters(
+            self.counter_model, {row[-1] for row in (*old_rows, *new_rows)},
+            self.counter_field, **self.counter_values
+        )
 
 
 class FavoriteInline(admin.TabularInline):
     model = Favorite
     extra = 0
 
-    def count_favorites(self, obj):
-        return obj.favorites.count()
-
 
 class CartInline(admin.TabularInline):
     model = Cart
@@ -39,17 +87,52 @@ class RecipeAdmin(admin.ModelAdmin):
         'is_published',
         'author',
         'created_at',
-        'count_favorites'
+        'favorites_count',
+        'carts_count'
     )
     search_fields = ('name', 'author__username')
     list_filter = ('name', 'author__username', 'tags')
+    list_select_related = ('author',)
     empty_value_display = 'Не задано'
 
-    def count_favorites(self, obj):
-        return obj.favorites.count()
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(
+            Q(search_vector=recipe_search_query(search_term))
+            | Q(author__username__icontains=search_term)
+        ), False
+
+    def save_model(self, request, obj, form, change):
+        author_ids = set(
+            Recipe.objects.filter(pk=obj.pk).values_list(
+                'author_id', flat=True
+            )
+        )
+        super().save_model(request, obj, form, change)
+        recount_counters(User, author_ids | {obj.author_id}, 'recipes_count')
+
+    def save_related(self, request, form, formsets, change):
+        recipe = form.instance
+        old_user_ids = shopping_list.get_cart_user_ids(recipe)
+        old_amounts = shopping_list.get_recipe_amounts(recipe)
+        super().save_related(request, form, formsets, change)
+        update_search_fields([recipe.pk])
+        recount_counters(
+            Recipe, [recipe.pk], 'favorites_count', 'carts_count',
+            popularity_dirty=True
+        )
+        shopping_list.replace_recipe(
+            old_user_ids, old_amounts,
+            shopping_list.get_cart_user_ids(recipe),
+            shopping_list.get_recipe_amounts(recipe)
+        )
 
     @admin.display(description='Картинка')
     def short_image(self, obj):
+        if variants_ready(obj):
+            url = obj.image.storage.url(obj.image_variants['thumb'])
+            return mark_safe(f'<img src={url} width="80" height="60"')
         if obj.image:
             return mark_safe(
                 f'<img src={obj.image.url} width="80" height="60"'
@@ -58,12 +141,13 @@ class RecipeAdmin(admin.ModelAdmin):
 
 
 @admin.register(Favorite)
-class FavoriteAdmin(admin.ModelAdmin):
+class FavoriteAdmin(CounterAdminMixin, admin.ModelAdmin):
     list_display = (
         'id',
         'author',
         'recipe'
     )
+    counter_field = 'favorites_count'
 
 
 @admin.register(Tag)
@@ -76,8 +160,23 @@ class TagAdmin(admin.ModelAdmin):
 
 
 @admin.register(Cart)
-class CartAdmin(admin.ModelAdmin):
+class CartAdmin(CounterAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'author', 'recipe')
     search_fields = ('author__username', 'recipe__name',)
     list_filter = ('author', 'recipe',)
     empty_value_display = 'Не задано'
+    counter_field = 'carts_count'
+
+    def rows_changed(self, old_rows, new_rows):
+        super().rows_changed(old_rows, new_rows)
+        old_rows, new_rows = set(old_rows), set(new_rows)
+        shopping_list.apply_carts(old_rows - new_rows, sign=-1)
+        shopping_list.apply_carts(new_rows - old_rows)
+
+
+@admin.register(ShoppingListItem)
+class ShoppingListItemAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'ingredient', 'total_amount')
+    search_fields = ('user__username', 'ingredient__name',)
+    list_filter = ('user',)
+    empty_value_display = 'Не задано'
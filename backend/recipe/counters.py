@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from recipe.models import Recipe
+from user.models import User
+
+COUNTERS = {
+    Recipe: {
+        'favorites_count': 'favorites',
+        'carts_count': 'carts',
+    },
+    User: {
+        'recipes_count': 'recipes',
+        'followers_count': 'following',
+    },
+}
+
+
+def change_counters(queryset, field, delta, **values):
+    return queryset.update(
+        **{field: Greatest(F(field) + delta, Value(0))}, **values
+    )
+
+
+def change_counter(model, pk, field, delta, **values):
+    change_counters(model.objects.filter(pk=pk), field, delta, **values)
+
+
+def expected_counts(model):
+    expressions = {}
+    for field, relation in COUNTERS[model].items():
+        related = model._meta.get_field(relation)
+        rows = related.related_model.objects.filter(
+            **{related.field.name: OuterRef('pk')}
+        ).order_by().values(related.field.name).annotate(
+            total=Count('pk')
+        ).values('total')
+        expressions[field] = Coalesce(Subquery(rows), Value(0))
+    return expressions
+
+
+def recount_counters(model, pks, *fields, **values):
+    expected = expected_counts(model)
+    return model.objects.filter(pk__in=pks).update(
+        **{field: expected[field] for field in fields}, **values
+    )
+
+
+def drifted_counters(model):
+    expected = {
+        f'expected_{field}': expression
+        for field, expression in expected_counts(model).items()
+    }
+    condition = Q()
+    for field in COUNTERS[model]:
+        condition |= ~Q(**{field: F(f'expected_{field}')})
+    return model.objects.annotate(**expected).filter(condition)
+
+
+def reconcile_counters(model):
+    with transaction.atomic():
+        return model.objects.filter(
+            pk__in=drifted_counters(model).values('pk')
+        ).update(**expected_counts(model))
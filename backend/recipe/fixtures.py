@@ -0,0 +1,312 @@
+import csv
+import io
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from multiprocessing import get_context
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import (DateTimeField, DurationField, ExpressionWrapper,
+                              F, Max, Value)
+from django.utils import timezone
+
+from ingredient.models import Ingredient
+from recipe.counters import expected_counts
+from recipe.models import Cart, Favorite, IngredientRecipe, Recipe, Tag
+from recipe.popularity import refresh_popularity
+from recipe.search import update_search_fields
+from recipe.shopping_list import rebuild_user_shopping_lists
+from user.models import Follow, User
+
+PREFIX = 'fixture'
+EMAIL_DOMAIN = 'fixture.foodgram.ru'
+PASSWORD = 'Fixture-12345'
+INGREDIENTS_PER_RECIPE = (3, 12)
+TAGS_PER_RECIPE = (1, 3)
+MIN_INGREDIENTS = 100
+MIN_TAGS = 3
+CHUNK_SIZE = 10000
+BATCH_SIZE = 5000
+DEFAULTS = {
+    'follows': 10,
+    'favorites': 15,
+    'carts': 3,
+    'zipf': 1.1,
+    'days': 365,
+    'workers': 1,
+}
+
+
+def fixture_email(number):
+    return f'{PREFIX}{number}@{EMAIL_DOMAIN}'
+
+
+# Inverse of the continuous power law on [1, size + 1): index 0 is the
+# most popular one, and no table of weights has to be kept in memory.
+def zipf_index(rng, size, exponent):
+    uniform = rng.random()
+    if exponent == 1:
+        rank = (size + 1) ** uniform
+    else:
+        power = 1 - exponent
+        rank = (((size + 1) ** power - 1) * uniform + 1) ** (1 / power)
+    return min(int(rank), size) - 1
+
+
+# A fixed permutation of indexes, so that popular rows are spread over
+# the whole id range instead of being the oldest ones.
+def shuffled(index, size):
+    step = 2654435761 % size or 1
+    while math.gcd(step, size) != 1:
+        step += 1
+    return index * step % size
+
+
+def zipf_sample(rng, first, size, count, exponent, exclude=None):
+    chosen = {
+        first + shuffled(zipf_index(rng, size, exponent), size)
+        for _ in range(count)
+    }
+    chosen.discard(exclude)
+    return sorted(chosen)
+
+
+def skewed_count(rng, average, limit):
+    if not average:
+        return 0
+    return min(int(rng.expovariate(1 / average)), limit)
+
+
+def chunks(first, count):
+    return [
+        (start, min(start + CHUNK_SIZE, first + count))
+        for start in range(first, first + count, CHUNK_SIZE)
+    ]
+
+
+def chunk_random(plan, kind, start):
+    return random.Random(f'{plan["seed"]}-{kind}-{start}')
+
+
+def copy_rows(table, columns, rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(table)} '
+            f'({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)',
+            buffer
+        )
+
+
+def recipe_step(plan):
+    return timedelta(days=plan['days']) / max(plan['recipes'] - 1, 1)
+
+
+def recipe_time(plan, recipe_id):
+    last = plan['recipes_first'] + plan['recipes'] - 1
+    return plan['end'] - (last - recipe_id) * recipe_step(plan)
+
+
+def create_users(plan, start, end):
+    number = plan['users_number'] + start - plan['users_first']
+    User.objects.bulk_create(
+        (
+            User(
+                id=user_id, username=f'{PREFIX}{number + offset}',
+                email=fixture_email(number + offset),
+                first_name=f'{PREFIX}{number + offset}',
+                last_name=f'{PREFIX}{number + offset}',
+                password=plan['password']
+            )
+            for offset, user_id in enumerate(range(start, end))
+        ),
+        batch_size=BATCH_SIZE
+    )
+    return end - start
+
+
+def create_recipes(plan, start, end):
+    rng = chunk_random(plan, 'recipes', start)
+    ingredient_ids, tag_ids = plan['ingredient_ids'], plan['tag_ids']
+    Recipe.objects.bulk_create(
+        (
+            Recipe(
+                id=recipe_id,
+                author_id=plan['users_first'] + shuffled(
+                    zipf_index(rng, plan['users'], plan['zipf']),
+                    plan['users']
+                ),
+                name=f'{PREFIX} рецепт {recipe_id}',
+                text=f'{PREFIX} описание {recipe_id}',
+                cooking_time=rng.randint(5, 180),
+                image='recipe_img/fixture.png',
+                popularity_dirty=True
+            )
+            for recipe_id in range(start, end)
+        ),
+        batch_size=BATCH_SIZE
+    )
+    last = plan['recipes_first'] + plan['recipes'] - 1
+    Recipe.objects.filter(pk__range=(start, end - 1)).update(
+        created_at=ExpressionWrapper(
+            Value(plan['end']) - ExpressionWrapper(
+                (Value(last) - F('id')) * Value(recipe_step(plan)),
+                output_field=DurationField()
+            ),
+            output_field=DateTimeField()
+        )
+    )
+    ingredients, tags = [], []
+    for recipe_id in range(start, end):
+        for index in zipf_sample(
+            rng, 0, len(ingredient_ids),
+            rng.randint(*INGREDIENTS_PER_RECIPE), plan['zipf']
+        ):
+            ingredients.append(
+                (recipe_id, ingredient_ids[index], rng.randint(1, 500))
+            )
+        for tag_id in rng.sample(
+            tag_ids, min(rng.randint(*TAGS_PER_RECIPE), len(tag_ids))
+        ):
+            tags.append((recipe_id, tag_id))
+    copy_rows(
+        IngredientRecipe._meta.db_table,
+        ('recipe_id', 'ingredient_id', 'amount'), ingredients
+    )
+    copy_rows(
+        Recipe.tags.through._meta.db_table, ('recipe_id', 'tag_id'), tags
+    )
+    update_search_fields(range(start, end))
+    return end - start
+
+
+def create_relations(plan, start, end):
+    rng = chunk_random(plan, 'relations', start)
+    follows, events = [], {Favorite: [], Cart: []}
+    averages = {Favorite: plan['favorites'], Cart: plan['carts']}
+    for user_id in range(start, end):
+        for author_id in zipf_sample(
+            rng, plan['users_first'], plan['users'],
+            skewed_count(rng, plan['follows'], plan['users']),
+            plan['zipf'], exclude=user_id
+        ):
+            follows.append((author_id, user_id))
+        for model, rows in events.items():
+            for recipe_id in zipf_sample(
+                rng, plan['recipes_first'], plan['recipes'],
+                skewed_count(rng, averages[model], plan['recipes']),
+                plan['zipf']
+            ):
+                created_at = recipe_time(plan, recipe_id)
+                created_at += (plan['end'] - created_at) * rng.random()
+                rows.append((user_id, recipe_id, created_at.isoformat()))
+    copy_rows(Follow._meta.db_table, ('user_id', 'following_id'), follows)
+    for model, rows in events.items():
+        copy_rows(
+            model._meta.db_table, ('author_id', 'recipe_id', 'created_at'),
+            rows
+        )
+    rebuild_user_shopping_lists(range(start, end))
+    return len(follows) + sum(len(rows) for rows in events.values())
+
+
+def update_user_counters(plan, start, end):
+    return User.objects.filter(pk__range=(start, end - 1)).update(
+        **expected_counts(User)
+    )
+
+
+def update_recipe_counters(plan, start, end):
+    updated = Recipe.objects.filter(pk__range=(start, end - 1)).update(
+        **expected_counts(Recipe)
+    )
+    while refresh_popularity(BATCH_SIZE):
+        pass
+    return updated
+
+
+def run_chunk(job):
+    function, plan, start, end = job
+    with transaction.atomic():
+        return function(plan, start, end)
+
+
+def run_phase(plan, function, ranges):
+    jobs = [(function, plan, start, end) for start, end in ranges]
+    if plan['workers'] == 1:
+        return sum(map(run_chunk, jobs))
+    connections.close_all()
+    with ProcessPoolExecutor(
+        plan['workers'], mp_context=get_context('fork')
+    ) as executor:
+        return sum(executor.map(run_chunk, jobs))
+
+
+def reference_ids(model, minimum, build):
+    ids = list(model.objects.order_by('id').values_list('id', flat=True))
+    if len(ids) < minimum:
+        model.objects.bulk_create(
+            build(number) for number in range(len(ids), minimum)
+        )
+        return reference_ids(model, minimum, build)
+    return ids
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+
+def make_plan(users, recipes, seed, options):
+    return {
+        **DEFAULTS,
+        **options,
+        'users': users,
+        'recipes': recipes,
+        'seed': seed,
+        'end': timezone.now(),
+        'password': make_password(PASSWORD),
+        'users_first': next_id(User),
+        'users_number': User.objects.filter(
+            email__endswith=f'@{EMAIL_DOMAIN}'
+        ).count(),
+        'recipes_first': next_id(Recipe),
+        'ingredient_ids': reference_ids(
+            Ingredient, MIN_INGREDIENTS,
+            lambda number: Ingredient(
+                name=f'{PREFIX} ингредиент {number}', measurement_unit='г'
+            )
+        ),
+        'tag_ids': reference_ids(
+            Tag, MIN_TAGS,
+            lambda number: Tag(
+                name=f'{PREFIX} тег {number}', color=f'#{number:06x}',
+                slug=f'{PREFIX}_{number}'
+            )
+        ),
+    }
+
+
+def generate_dataset(users, recipes, seed=0, **options):
+    if not users:
+        raise ValueError('At least one user is needed')
+    plan = make_plan(users, recipes, seed, options)
+    user_ranges = chunks(plan['users_first'], users)
+    recipe_ranges = chunks(plan['recipes_first'], recipes)
+    counts = {
+        'users': run_phase(plan, create_users, user_ranges),
+        'recipes': run_phase(plan, create_recipes, recipe_ranges),
+        'relations': run_phase(plan, create_relations, user_ranges),
+    }
+    run_phase(plan, update_user_counters, user_ranges)
+    run_phase(plan, update_recipe_counters, recipe_ranges)
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(
+            no_style(), [User, Recipe]
+        ):
+            cursor.execute(sql)
+    return counts
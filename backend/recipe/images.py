@@ -0,0 +1,113 @@
+import io
+import os
+
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.fields.json import KeyTextTransform
+from PIL import Image, ImageOps
+
+from foodgram import constants
+from recipe.models import Recipe
+
+IMAGE_LOCK_CLASS = 1
+
+
+def variants_ready(recipe):
+    return (
+        bool(recipe.image)
+        and recipe.image_variants.get('source') == recipe.image.name
+        and 'thumb' in recipe.image_variants
+    )
+
+
+def pending_recipes():
+    return Recipe.objects.exclude(image='').alias(
+        variants_source=KeyTextTransform('source', 'image_variants')
+    ).filter(
+        Q(variants_source__isnull=True) | ~Q(variants_source=F('image'))
+    ).order_by('id')
+
+
+def get_lock_key(pk):
+    return [IMAGE_LOCK_CLASS, pk % 2 ** 31]
+
+
+def claim_recipe(pk):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_try_advisory_lock(%s, %s)', get_lock_key(pk)
+        )
+        if not cursor.fetchone()[0]:
+            return None
+    recipe = pending_recipes().filter(pk=pk).first()
+    if recipe is None:
+        release_recipe(pk)
+    return recipe
+
+
+def release_recipe(pk):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_unlock(%s, %s)', get_lock_key(pk))
+
+
+def save_webp(storage, image, name):
+    buffer = io.BytesIO()
+    image.save(buffer, 'WEBP', quality=constants.IMAGE_VARIANT_QUALITY)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def delete_variants(storage, variants):
+    names = [name for name, _ in variants.get('srcset', [])]
+    if 'thumb' in variants:
+        names.append(variants['thumb'])
+    for name in names:
+        storage.delete(name)
+
+
+def build_variants(recipe):
+    storage = recipe.image.storage
+    with recipe.image.open('rb') as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+    stem = os.path.splitext(os.path.basename(recipe.image.name))[0]
+    variants = {
+        'source': recipe.image.name,
+        'thumb': save_webp(
+            storage,
+            ImageOps.fit(image, constants.IMAGE_THUMBNAIL_SIZE),
+            f'recipe_img/variants/{stem}_thumb.webp'
+        ),
+        'srcset': [],
+    }
+    for width in constants.IMAGE_VARIANT_WIDTHS:
+        variant = image.copy()
+        variant.thumbnail((width, image.height))
+        variants['srcset'].append([
+            save_webp(
+                storage, variant, f'recipe_img/variants/{stem}_{width}.webp'
+            ),
+            variant.width
+        ])
+        if variant.width < width:
+            break
+    return variants
+
+
+def process_recipe(recipe):
+    old_variants = recipe.image_variants
+    try:
+        recipe.image_variants = build_variants(recipe)
+    except Exception as error:
+        recipe.image_variants = {
+            'source': recipe.image.name, 'error': str(error)
+        }
+    updated = Recipe.objects.filter(
+        pk=recipe.pk, image=recipe.image.name
+    ).update(image_variants=recipe.image_variants)
+    delete_variants(
+        recipe.image.storage,
+        old_variants if updated else recipe.image_variants
+    )
+    return recipe
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.11 on 2026-10-18 19:49
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_rows(model):
+    rows = model.objects.filter(recipe=OuterRef('pk')).order_by().values(
+        'recipe'
+    ).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(rows), Value(0))
+
+
+def fill_counters(apps, schema_editor):
+    Recipe = apps.get_model('recipe', 'Recipe')
+    Recipe.objects.update(
+        favorites_count=count_rows(apps.get_model('recipe', 'Favorite')),
+        carts_count=count_rows(apps.get_model('recipe', 'Cart'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0005_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='carts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В списках покупок'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В избранном'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
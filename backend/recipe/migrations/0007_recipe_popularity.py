@@ -0,0 +1,50 @@
+# Generated by Django 4.2.11 on 2026-10-18 20:05
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def mark_popular_recipes(apps, schema_editor):
+    Recipe = apps.get_model('recipe', 'Recipe')
+    Recipe.objects.filter(
+        Q(favorites_count__gt=0) | Q(carts_count__gt=0)
+    ).update(popularity_dirty=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0006_recipe_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Добавлено'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Добавлено'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='popularity',
+            field=models.FloatField(default=0, editable=False, verbose_name='Популярность'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='popularity_dirty',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Нужно пересчитать популярность'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='trending',
+            field=models.FloatField(default=0, editable=False, verbose_name='Популярность за последние дни'),
+        ),
+        migrations.RunPython(mark_popular_recipes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-18 20:05
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('recipe', '0007_recipe_popularity'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['-popularity', '-created_at', '-id'], name='recipe_popularity_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['-trending', '-created_at', '-id'], name='recipe_trending_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('popularity_dirty', True)), fields=['id'], name='recipe_popularity_dirty_idx'),
+        ),
+    ]
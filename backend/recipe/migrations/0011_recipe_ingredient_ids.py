@@ -0,0 +1,34 @@
+# Generated by Django 4.2.11 on 2026-10-18 20:35
+
+import django.contrib.postgres.fields
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import migrations, models
+from django.db.models import OuterRef
+
+
+def fill_ingredient_ids(apps, schema_editor):
+    Recipe = apps.get_model('recipe', 'Recipe')
+    IngredientRecipe = apps.get_model('recipe', 'IngredientRecipe')
+    Recipe.objects.update(
+        ingredient_ids=ArraySubquery(
+            IngredientRecipe.objects.filter(
+                recipe=OuterRef('pk')
+            ).order_by('ingredient_id').values('ingredient_id')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0010_recipe_search_vector_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredient_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, editable=False, size=None, verbose_name='Id ингредиентов'),
+        ),
+        migrations.RunPython(fill_ingredient_ids, migrations.RunPython.noop),
+    ]
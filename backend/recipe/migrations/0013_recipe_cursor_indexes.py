@@ -0,0 +1,33 @@
+# Generated by Django 4.2.11 on 2026-10-18 21:30
+
+from django.contrib.postgres.operations import (AddIndexConcurrently,
+                                                RemoveIndexConcurrently)
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('recipe', '0012_recipe_ingredient_ids_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['-created_at', '-id'], name='recipe_created_at_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='recipe',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='recipe_author_created_id_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='recipe',
+            name='recipe_created_at_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='recipe',
+            name='recipe_author_created_at_idx',
+        ),
+    ]
@@ -1,4 +1,7 @@
 from colorfield.fields import ColorField
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.db import models
 
@@ -35,6 +38,9 @@ class Recipe(models.Model):
     )
     name = models.CharField('Название', max_length=constants.MAX_LENGTH)
     image = models.ImageField('Картинка', upload_to='recipe_img/')
+    image_variants = models.JSONField(
+        'Уменьшенные копии картинки', default=dict, blank=True
+    )
     text = models.TextField('Описание')
     tags = models.ManyToManyField(Tag, verbose_name='Теги')
     ingredients = models.ManyToManyField(
@@ -56,12 +62,59 @@ class Recipe(models.Model):
     )
     created_at = models.DateTimeField(
         'Добавлено', auto_now_add=True)
+    favorites_count = models.PositiveIntegerField(
+        'В избранном', default=0, editable=False
+    )
+    carts_count = models.PositiveIntegerField(
+        'В списках покупок', default=0, editable=False
+    )
+    popularity = models.FloatField('Популярность', default=0, editable=False)
+    trending = models.FloatField(
+        'Популярность за последние дни', default=0, editable=False
+    )
+    popularity_dirty = models.BooleanField(
+        'Нужно пересчитать популярность', default=False, editable=False
+    )
+    search_vector = SearchVectorField(
+        'Поисковый индекс', null=True, editable=False
+    )
+    ingredient_ids = ArrayField(
+        models.BigIntegerField(), verbose_name='Id ингредиентов',
+        default=list, editable=False
+    )
 
     class Meta:
         default_related_name = 'recipes'
         ordering = ['-created_at']
         verbose_name = 'рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'], name='recipe_created_at_id_idx'
+            ),
+            models.Index(
+                fields=['author', '-created_at', '-id'],
+                name='recipe_author_created_id_idx'
+            ),
+            models.Index(
+                fields=['-popularity', '-created_at', '-id'],
+                name='recipe_popularity_idx'
+            ),
+            models.Index(
+                fields=['-trending', '-created_at', '-id'],
+                name='recipe_trending_idx'
+            ),
+            models.Index(
+                fields=['id'], condition=models.Q(popularity_dirty=True),
+                name='recipe_popularity_dirty_idx'
+            ),
+            GinIndex(
+                fields=['search_vector'], name='recipe_search_vector_idx'
+            ),
+            GinIndex(
+                fields=['ingredient_ids'], name='recipe_ingredient_ids_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name[:constants.RESTRICTION_STRING]
@@ -104,6 +157,7 @@ class Cart(models.Model):
     recipe = models.ForeignKey(
         Recipe, on_delete=models.CASCADE
     )
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
 
     class Meta:
         ordering = ['author']
@@ -122,6 +176,7 @@ class Cart(models.Model):
 class Favorite(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
 
     class Meta:
         ordering = ['author']
@@ -135,3 +190,26 @@ class Favorite(models.Model):
 
     def __str__(self):
         return f'Рецепт {self.recipe} в избранном у {self.author}'
+
+
+class ShoppingListItem(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, verbose_name='Пользователь'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient, on_delete=models.CASCADE, verbose_name='Ингредиент'
+    )
+    total_amount = models.PositiveIntegerField('Количество', default=0)
+
+    class Meta:
+        ordering = ['user', 'ingredient']
+        default_related_name = 'shopping_list_items'
+        verbose_name = 'позицию списка покупок'
+        verbose_name_plural = 'Список покупок'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'ingredient'],
+                                    name='unique_shopping_list_item')
+        ]
+
+    def __str__(self):
+        return f'{self.ingredient} в списке покупок у {self.user}'
@@ -0,0 +1,70 @@
+import math
+from collections import defaultdict
+
+from django.db import transaction
+
+from foodgram import constants
+from recipe.models import Cart, Favorite, Recipe
+
+SCORE_HALF_LIVES = {
+    'popularity': constants.POPULARITY_HALF_LIFE,
+    'trending': constants.TRENDING_HALF_LIFE,
+}
+EVENT_WEIGHTS = (
+    (Favorite, constants.POPULARITY_FAVORITE_WEIGHT),
+    (Cart, constants.POPULARITY_CART_WEIGHT),
+)
+
+
+# Every event is worth weight * 2 ** (age / half_life) counted from the
+# epoch, so stored scores never have to be decayed again: they compare
+# the same way as scores decayed to the current moment.
+def decayed_score(events, half_life):
+    if not events:
+        return 0
+    exponents = [
+        (
+            weight,
+            (created_at.timestamp() - constants.POPULARITY_EPOCH) / half_life
+        )
+        for weight, created_at in events
+    ]
+    top = max(exponent for _, exponent in exponents)
+    return top + math.log2(sum(
+        weight * 2 ** (exponent - top) for weight, exponent in exponents
+    ))
+
+
+def recipe_events(recipe_ids):
+    events = defaultdict(list)
+    for model, weight in EVENT_WEIGHTS:
+        rows = model.objects.filter(recipe_id__in=recipe_ids).values_list(
+            'recipe_id', 'created_at'
+        )
+        for recipe_id, created_at in rows.iterator():
+            events[recipe_id].append((weight, created_at))
+    return events
+
+
+def mark_all_dirty():
+    return Recipe.objects.update(popularity_dirty=True)
+
+
+def refresh_popularity(batch_size):
+    with transaction.atomic():
+        recipes = list(
+            Recipe.objects.filter(popularity_dirty=True).select_for_update(
+                skip_locked=True
+            ).only('id').order_by('id')[:batch_size]
+        )
+        events = recipe_events([recipe.id for recipe in recipes])
+        for recipe in recipes:
+            for field, half_life in SCORE_HALF_LIVES.items():
+                setattr(
+                    recipe, field, decayed_score(events[recipe.id], half_life)
+                )
+            recipe.popularity_dirty = False
+        Recipe.objects.bulk_update(
+            recipes, [*SCORE_HALF_LIVES, 'popularity_dirty']
+        )
+    return len(recipes)
@@ -0,0 +1,91 @@
+from django.db import connection
+
+from foodgram.constants import MAX_ID
+
+
+def parse_id(value):
+    if not value.isascii() or not value.isdigit():
+        return None
+    value = int(value)
+    return value if 0 < value <= MAX_ID else None
+
+
+def get_columns(model, owner_field, target_field):
+    meta = model._meta
+    target = meta.get_field(target_field)
+    return (
+        meta.db_table, meta.get_field(owner_field).column, target.column,
+        target.related_model
+    )
+
+
+def add_relation(model, owner_field, owner_id, target_field, target_id,
+                 fields, **values):
+    table, owner, target, target_model = get_columns(
+        model, owner_field, target_field
+    )
+    columns = ', '.join(
+        target_model._meta.get_field(field).column for field in fields
+    )
+    extra = ''.join(
+        f', {model._meta.get_field(field).column}' for field in values
+    )
+    rows = list(target_model.objects.raw(
+        f'WITH target AS ('
+        f'SELECT {columns} FROM {target_model._meta.db_table} WHERE id = %s'
+        f'), inserted AS ('
+        f'INSERT INTO {table} ({owner}, {target}{extra}) '
+        f'SELECT %s, id{", %s" * len(values)} FROM target '
+        f'ON CONFLICT DO NOTHING RETURNING {target}'
+        f') SELECT target.*, EXISTS (SELECT 1 FROM inserted) AS created '
+        f'FROM target',
+        [target_id, owner_id, *values.values()]
+    ))
+    if not rows:
+        return None, False
+    return rows[0], rows[0].created
+
+
+def delete_relation(model, owner_field, owner_id, target_field, target_id):
+    table, owner, target, target_model = get_columns(
+        model, owner_field, target_field
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH deleted AS ('
+            f'DELETE FROM {table} WHERE {owner} = %s AND {target} = %s '
+            f'RETURNING {target}'
+            f') SELECT EXISTS ('
+            f'SELECT 1 FROM {target_model._meta.db_table} WHERE id = %s'
+            f'), EXISTS (SELECT 1 FROM deleted)',
+            [owner_id, target_id, target_id]
+        )
+        return cursor.fetchone()
+
+
+def add_relations(model, owner_field, owner_id, target_field, target_ids,
+                  **values):
+    table, owner, target, _ = get_columns(model, owner_field, target_field)
+    extra = ''.join(
+        f', {model._meta.get_field(field).column}' for field in values
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({owner}, {target}{extra}) '
+            f'SELECT %s, target_id{", %s" * len(values)} '
+            f'FROM unnest(%s::bigint[]) AS target_id '
+            f'ON CONFLICT DO NOTHING RETURNING {target}',
+            [owner_id, *values.values(), list(target_ids)]
+        )
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def delete_relations(model, owner_field, owner_id, target_field, target_ids):
+    table, owner, target, _ = get_columns(model, owner_field, target_field)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} '
+            f'WHERE {owner} = %s AND {target} = ANY(%s) RETURNING {target}',
+            [owner_id, list(target_ids)]
+        )
+        return sorted({row[0] for row in cursor.fetchall()})
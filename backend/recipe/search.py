@@ -0,0 +1,81 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db.models import (F, FloatField, Func, IntegerField, OuterRef,
+                              Subquery)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+from foodgram.constants import SEARCH_CONFIG
+from recipe.models import IngredientRecipe, Recipe
+
+SEARCH_ORDERING = ('-search_rank', '-created_at', '-id')
+COOKABLE_ORDERING = (
+    '-ingredients_covered', 'ingredients_total', '-created_at', '-id'
+)
+
+
+def recipe_search_vector():
+    ingredient_names = IngredientRecipe.objects.filter(
+        recipe=OuterRef('pk')
+    ).order_by().values('recipe').annotate(
+        names=StringAgg('ingredient__name', ' ')
+    ).values('names')
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(
+            Subquery(ingredient_names), weight='B', config=SEARCH_CONFIG
+        )
+        + SearchVector('text', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def recipe_ingredient_ids():
+    return ArraySubquery(
+        IngredientRecipe.objects.filter(
+            recipe=OuterRef('pk')
+        ).order_by('ingredient_id').values('ingredient_id')
+    )
+
+
+def update_search_fields(recipes):
+    Recipe.objects.filter(pk__in=recipes).update(
+        search_vector=recipe_search_vector(),
+        ingredient_ids=recipe_ingredient_ids()
+    )
+
+
+def recipe_search_query(text):
+    return SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def search_recipes(queryset, text):
+    query = recipe_search_query(text)
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=Cast(
+            SearchRank(F('search_vector'), query), output_field=FloatField()
+        )
+    )
+
+
+def cookable_recipes(queryset, ingredient_ids, full=False):
+    if full:
+        queryset = queryset.filter(ingredient_ids__contained_by=ingredient_ids)
+    else:
+        queryset = queryset.filter(ingredient_ids__overlap=ingredient_ids)
+    covered = RawSQL(
+        'SELECT count(*) FROM unnest('
+        f'{Recipe._meta.db_table}.ingredient_ids) AS ingredient_id '
+        'WHERE ingredient_id = ANY(%s::bigint[])',
+        (ingredient_ids,),
+        output_field=IntegerField()
+    )
+    total = Func(
+        F('ingredient_ids'), function='cardinality',
+        output_field=IntegerField()
+    )
+    return queryset.annotate(
+        ingredients_covered=covered,
+        ingredients_total=total
+    ).order_by(*COOKABLE_ORDERING)
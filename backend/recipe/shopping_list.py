@@ -0,0 +1,168 @@
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from recipe.models import Cart, IngredientRecipe, ShoppingListItem
+
+
+def get_recipe_amounts(recipe):
+    return dict(
+        IngredientRecipe.objects.filter(recipe=recipe).values_list(
+            'ingredient_id', 'amount'
+        )
+    )
+
+
+def apply_amounts(user_ids, amounts, sign=1):
+    amounts = {
+        ingredient_id: amount * sign
+        for ingredient_id, amount in amounts.items() if amount
+    }
+    if not amounts:
+        return
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    table = ShoppingListItem._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH amounts AS ('
+            f'SELECT * FROM unnest(%s::bigint[], %s::integer[]) '
+            f'AS amount (ingredient_id, delta)'
+            f'), decreased AS ('
+            f'UPDATE {table} item '
+            f'SET total_amount = '
+            f'GREATEST(item.total_amount + amount.delta, 0) '
+            f'FROM amounts amount '
+            f'WHERE item.user_id = ANY(%s) '
+            f'AND item.ingredient_id = amount.ingredient_id '
+            f'AND amount.delta < 0'
+            f') INSERT INTO {table} AS item '
+            f'(user_id, ingredient_id, total_amount) '
+            f'SELECT user_id, amount.ingredient_id, amount.delta '
+            f'FROM unnest(%s::bigint[]) AS user_id, amounts amount '
+            f'WHERE amount.delta > 0 '
+            f'ON CONFLICT (user_id, ingredient_id) DO UPDATE '
+            f'SET total_amount = item.total_amount + EXCLUDED.total_amount',
+            [list(amounts), list(amounts.values()), user_ids, user_ids]
+        )
+        if min(amounts.values()) < 0:
+            ShoppingListItem.objects.filter(
+                user_id__in=user_ids, total_amount__lte=0
+            ).delete()
+
+
+def get_recipes_amounts(recipe_ids):
+    return dict(
+        IngredientRecipe.objects.filter(recipe__in=recipe_ids).values(
+            'ingredient_id'
+        ).annotate(total=Sum('amount')).order_by().values_list(
+            'ingredient_id', 'total'
+        )
+    )
+
+
+def add_recipe(user, recipe):
+    apply_amounts([user.id], get_recipe_amounts(recipe))
+
+
+def remove_recipe(user, recipe):
+    apply_amounts([user.id], get_recipe_amounts(recipe), sign=-1)
+
+
+def add_recipes(user, recipe_ids):
+    if recipe_ids:
+        apply_amounts([user.id], get_recipes_amounts(recipe_ids))
+
+
+def remove_recipes(user, recipe_ids):
+    if recipe_ids:
+        apply_amounts([user.id], get_recipes_amounts(recipe_ids), sign=-1)
+
+
+def apply_carts(rows, sign=1):
+    recipe_ids = defaultdict(list)
+    for user_id, recipe_id in rows:
+        recipe_ids[user_id].append(recipe_id)
+    for user_id, ids in recipe_ids.items():
+        apply_amounts([user_id], get_recipes_amounts(ids), sign)
+
+
+def get_cart_user_ids(recipe):
+    return set(
+        Cart.objects.filter(recipe=recipe).values_list('author_id', flat=True)
+    )
+
+
+def get_amount_changes(old_amounts, new_amounts):
+    return {
+        ingredient_id: (
+            new_amounts.get(ingredient_id, 0)
+            - old_amounts.get(ingredient_id, 0)
+        )
+        for ingredient_id in old_amounts.keys() | new_amounts.keys()
+    }
+
+
+def change_recipe(recipe, old_amounts, new_amounts):
+    apply_amounts(
+        get_cart_user_ids(recipe),
+        get_amount_changes(old_amounts, new_amounts)
+    )
+
+
+def replace_recipe(old_user_ids, old_amounts, new_user_ids, new_amounts):
+    apply_amounts(old_user_ids - new_user_ids, old_amounts, sign=-1)
+    apply_amounts(new_user_ids - old_user_ids, new_amounts)
+    apply_amounts(
+        old_user_ids & new_user_ids,
+        get_amount_changes(old_amounts, new_amounts)
+    )
+
+
+def rebuild_user_shopping_lists(user_ids):
+    user_ids = list(user_ids)
+    with transaction.atomic():
+        ShoppingListItem.objects.filter(user_id__in=user_ids).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {ShoppingListItem._meta.db_table} '
+                '(user_id, ingredient_id, total_amount) '
+                'SELECT cart.author_id, item.ingredient_id, SUM(item.amount) '
+                f'FROM {Cart._meta.db_table} cart '
+                f'JOIN {IngredientRecipe._meta.db_table} item '
+                'ON item.recipe_id = cart.recipe_id '
+                'WHERE cart.author_id = ANY(%s) '
+                'GROUP BY cart.author_id, item.ingredient_id',
+                [user_ids]
+            )
+
+
+def calculate_shopping_lists():
+    rows = IngredientRecipe.objects.filter(
+        recipe__carts__isnull=False
+    ).values_list(
+        'recipe__carts__author', 'ingredient'
+    ).annotate(total_amount=Sum('amount')).order_by()
+    return {
+        (user_id, ingredient_id): total_amount
+        for user_id, ingredient_id, total_amount in rows
+    }
+
+
+def rebuild_shopping_lists(batch_size=1000):
+    with transaction.atomic():
+        ShoppingListItem.objects.all().delete()
+        ShoppingListItem.objects.bulk_create(
+            (
+                ShoppingListItem(
+                    user_id=user_id,
+                    ingredient_id=ingredient_id,
+                    total_amount=total_amount
+                )
+                for (user_id, ingredient_id), total_amount
+                in calculate_shopping_lists().items()
+            ),
+            batch_size=batch_size
+        )
@@ -0,0 +1,138 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from recipe.counters import COUNTERS, drifted_counters, reconcile_counters
+from recipe.models import Cart, Favorite, Recipe
+from tests.utils import (PASSWORD, create_ingredients, create_recipes,
+                         create_tags, create_user, get_admin_form_data,
+                         refresh_derived_data)
+from user.models import Follow, User
+
+
+class AdminCountersTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@test.ru', password=PASSWORD
+        )
+        cls.authors = [create_user(f'author{i}') for i in range(2)]
+        cls.viewers = [create_user(f'viewer{i}') for i in range(2)]
+        tags = create_tags(1)
+        ingredients = create_ingredients(2)
+        cls.recipes = [
+            recipe for author in cls.authors
+            for recipe in create_recipes(
+                author, 2, ingredients, tags, author.username
+            )
+        ]
+        for model in (Favorite, Cart):
+            model.objects.bulk_create([
+                model(author=viewer, recipe=recipe)
+                for viewer in cls.viewers for recipe in cls.recipes
+            ])
+        Follow.objects.bulk_create([
+            Follow(user=author, following=viewer)
+            for author in cls.authors for viewer in cls.viewers
+        ])
+        refresh_derived_data()
+        Recipe.objects.update(popularity_dirty=False)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def assert_no_drift(self):
+        for model in COUNTERS:
+            self.assertFalse(
+                drifted_counters(model).values_list('pk', flat=True)
+            )
+
+    def post(self, name, args=(), data=None):
+        response = self.client.post(
+            reverse(f'admin:{name}', args=args), data or {'post': 'yes'}
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_drift_is_found(self):
+        recipe, author = self.recipes[0], self.authors[0]
+        Recipe.objects.filter(pk=recipe.pk).update(favorites_count=10)
+        User.objects.filter(pk=author.pk).update(followers_count=0)
+        self.assertEqual(list(drifted_counters(Recipe)), [recipe])
+        self.assertEqual(list(drifted_counters(User)), [author])
+        self.assertEqual(reconcile_counters(Recipe), 1)
+        self.assertEqual(reconcile_counters(User), 1)
+        self.assert_no_drift()
+
+    def test_relation_admins(self):
+        recipe = self.recipes[0]
+        for model, name in ((Favorite, 'favorite'), (Cart, 'cart')):
+            with self.subTest(model=name):
+                self.post(
+                    f'recipe_{name}_add',
+                    data={'author': self.authors[1].pk, 'recipe': recipe.pk}
+                )
+                self.assert_no_drift()
+                row = model.objects.get(author=self.authors[1])
+                self.post(
+                    f'recipe_{name}_change', [row.pk],
+                    {'author': self.authors[1].pk, 'recipe': self.recipes[1].pk}
+                )
+                self.assert_no_drift()
+                self.post(f'recipe_{name}_delete', [row.pk])
+                self.assert_no_drift()
+                self.post(f'recipe_{name}_changelist', data={
+                    'action': 'delete_selected', 'post': 'yes',
+                    '_selected_action': list(model.objects.filter(
+                        author=self.viewers[0]
+                    ).values_list('pk', flat=True)),
+                })
+                self.assert_no_drift()
+        self.assertFalse(
+            Recipe.objects.filter(popularity_dirty=False).exists()
+        )
+
+    def test_follow_admin(self):
+        self.post(
+            'user_follow_add',
+            data={'user': self.viewers[0].pk, 'following': self.authors[0].pk}
+        )
+        self.assert_no_drift()
+        follow = Follow.objects.get(user=self.viewers[0])
+        self.post(
+            'user_follow_change', [follow.pk],
+            {'user': self.viewers[1].pk, 'following': self.authors[0].pk}
+        )
+        self.assert_no_drift()
+        self.post('user_follow_delete', [follow.pk])
+        self.assert_no_drift()
+
+    def test_recipe_admin(self):
+        recipe = self.recipes[0]
+        path = reverse('admin:recipe_recipe_change', args=[recipe.pk])
+        data = get_admin_form_data(self.client.get(path))
+        data['ingredients'] = list(
+            recipe.ingredient_recipes.values_list('pk', flat=True)
+        )
+        data.update({
+            'author': self.authors[1].pk,
+            'favorites-0-DELETE': 'on',
+            'carts-0-DELETE': 'on',
+            'carts-1-DELETE': 'on',
+        })
+        response = self.client.post(path, data)
+        self.assertEqual(
+            response.status_code, 302,
+            response.context and response.context['errors']
+        )
+        self.assert_no_drift()
+        self.post('recipe_recipe_delete', [recipe.pk])
+        self.assert_no_drift()
+
+    def test_cascade_deletes(self):
+        self.post('user_user_delete', [self.viewers[0].pk])
+        self.assert_no_drift()
+        self.authors[0].delete()
+        self.assert_no_drift()
+        self.assertEqual(
+            Recipe.objects.filter(popularity_dirty=True).count(), 2
+        )
@@ -0,0 +1,156 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from recipe.models import Cart, IngredientRecipe, ShoppingListItem
+from recipe.shopping_list import calculate_shopping_lists
+from tests.utils import (PASSWORD, create_ingredients, create_recipes,
+                         create_tags, create_user, get_admin_form_data,
+                         refresh_derived_data)
+from user.models import User
+
+
+class AdminShoppingListsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@test.ru', password=PASSWORD
+        )
+        cls.author = create_user('author')
+        cls.viewers = [create_user(f'viewer{i}') for i in range(2)]
+        tags = create_tags(1)
+        cls.ingredients = create_ingredients(4)
+        cls.recipe, cls.other = create_recipes(
+            cls.author, 2, cls.ingredients[:2], tags
+        )
+        Cart.objects.bulk_create([
+            Cart(author=viewer, recipe=recipe)
+            for viewer in cls.viewers for recipe in (cls.recipe, cls.other)
+        ])
+        refresh_derived_data()
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def assert_shopping_lists(self):
+        self.assertEqual(
+            {
+                (item.user_id, item.ingredient_id): item.total_amount
+                for item in ShoppingListItem.objects.all()
+            },
+            calculate_shopping_lists()
+        )
+
+    def get_amount(self, viewer, ingredient):
+        return ShoppingListItem.objects.filter(
+            user=viewer, ingredient=ingredient
+        ).values_list('total_amount', flat=True).first()
+
+    def change_recipe(self, **changes):
+        path = reverse('admin:recipe_recipe_change', args=[self.recipe.pk])
+        data = get_admin_form_data(self.client.get(path))
+        data['ingredients'] = list(
+            self.recipe.ingredient_recipes.values_list('pk', flat=True)
+        )
+        data.update(changes)
+        response = self.client.post(path, data)
+        self.assertEqual(
+            response.status_code, 302,
+            response.context and response.context['errors']
+        )
+
+    def test_edit_recipe_ingredients(self):
+        first, second, third = self.ingredients[:3]
+        rows = list(self.recipe.ingredient_recipes.order_by('id'))
+        self.change_recipe(**{
+            'ingredient_recipes-0-amount': rows[0].amount + 10,
+            'ingredient_recipes-1-DELETE': 'on',
+            'ingredient_recipes-TOTAL_FORMS': 3,
+            'ingredient_recipes-2-recipe': self.recipe.pk,
+            'ingredient_recipes-2-ingredient': third.pk,
+            'ingredient_recipes-2-amount': 7,
+        })
+        other_amounts = dict(
+            self.other.ingredient_recipes.values_list('ingredient', 'amount')
+        )
+        for viewer in self.viewers:
+            self.assertEqual(
+                self.get_amount(viewer, first),
+                rows[0].amount + 10 + other_amounts[first.pk]
+            )
+            self.assertEqual(
+                self.get_amount(viewer, second), other_amounts[second.pk]
+            )
+            self.assertEqual(self.get_amount(viewer, third), 7)
+        self.assert_shopping_lists()
+
+    def test_edit_recipe_carts(self):
+        carts = list(self.recipe.carts.order_by('id'))
+        self.change_recipe(**{
+            'carts-0-DELETE': 'on',
+            'carts-1-author': self.author.pk,
+        })
+        self.assertEqual(
+            set(self.recipe.carts.values_list('author', flat=True)),
+            {self.author.pk}
+        )
+        self.assertNotEqual(carts[1].author, self.author)
+        self.assert_shopping_lists()
+
+    def test_cart_admin(self):
+        response = self.client.post(
+            reverse('admin:recipe_cart_add'),
+            {'author': self.author.pk, 'recipe': self.recipe.pk}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assert_shopping_lists()
+        cart = Cart.objects.get(author=self.author)
+        response = self.client.post(
+            reverse('admin:recipe_cart_change', args=[cart.pk]),
+            {'author': self.author.pk, 'recipe': self.other.pk}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assert_shopping_lists()
+        self.client.post(
+            reverse('admin:recipe_cart_delete', args=[cart.pk]),
+            {'post': 'yes'}
+        )
+        self.assertFalse(Cart.objects.filter(author=self.author).exists())
+        self.assert_shopping_lists()
+        self.client.post(reverse('admin:recipe_cart_changelist'), {
+            'action': 'delete_selected', 'post': 'yes',
+            '_selected_action': list(
+                self.viewers[0].carts.values_list('pk', flat=True)
+            ),
+        })
+        self.assertFalse(self.viewers[0].carts.exists())
+        self.assert_shopping_lists()
+
+    def test_ingredient_recipe_admin(self):
+        row = self.recipe.ingredient_recipes.first()
+        response = self.client.post(
+            reverse('admin:recipe_ingredientrecipe_change', args=[row.pk]),
+            {
+                'recipe': self.other.pk,
+                'ingredient': self.ingredients[3].pk,
+                'amount': 5,
+            }
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assert_shopping_lists()
+        self.client.post(
+            reverse('admin:recipe_ingredientrecipe_delete', args=[row.pk]),
+            {'post': 'yes'}
+        )
+        self.assertFalse(IngredientRecipe.objects.filter(pk=row.pk).exists())
+        self.assert_shopping_lists()
+
+    def test_recipe_and_author_deletes(self):
+        self.client.post(
+            reverse('admin:recipe_recipe_delete', args=[self.recipe.pk]),
+            {'post': 'yes'}
+        )
+        self.assert_shopping_lists()
+        self.author.delete()
+        self.assert_shopping_lists()
+        self.assertFalse(ShoppingListItem.objects.exists())
@@ -0,0 +1,103 @@
+import asyncio
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+
+from tests.utils import create_ingredients, create_tags
+
+NAMESPACES = ('async', 'sync')
+
+
+@override_settings(ROOT_URLCONF='tests.urls')
+class AsyncReadViewsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tags = create_tags(3)
+        cls.ingredients = create_ingredients(3, 'Морковь') + (
+            create_ingredients(2, 'Молоко')
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    async def get(self, namespace, route, *args, **params):
+        response = await self.async_client.get(
+            reverse(f'{namespace}:{route}', args=args), params
+        )
+        return response.status_code, response.json()
+
+    async def assert_same(self, route, *args, **params):
+        responses = {
+            namespace: await self.get(namespace, route, *args, **params)
+            for namespace in NAMESPACES
+        }
+        self.assertEqual(responses['async'], responses['sync'])
+        return responses['async']
+
+    def test_async_views_follow_the_setting(self):
+        for namespace, is_async in (('async', True), ('sync', False)):
+            for route, args in (
+                ('tags-list', ()),
+                ('tags-detail', (self.tags[0].pk,)),
+                ('ingredients-list', ()),
+                ('ingredients-detail', (self.ingredients[0].pk,)),
+            ):
+                with self.subTest(namespace=namespace, route=route):
+                    view = resolve(
+                        reverse(f'{namespace}:{route}', args=args)
+                    ).func
+                    self.assertEqual(
+                        asyncio.iscoroutinefunction(view), is_async
+                    )
+
+    async def test_list(self):
+        status, tags = await self.assert_same('tags-list')
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            [tag['id'] for tag in tags], [tag.pk for tag in self.tags]
+        )
+        status, ingredients = await self.assert_same('ingredients-list')
+        self.assertEqual(status, 200)
+        self.assertEqual(len(ingredients), len(self.ingredients))
+        status, ingredients = await self.assert_same(
+            'ingredients-list', name='мол'
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            [ingredient['name'] for ingredient in ingredients],
+            ['Молоко0', 'Молоко1']
+        )
+
+    async def test_retrieve(self):
+        for route, instance in (
+            ('tags-detail', self.tags[1]),
+            ('ingredients-detail', self.ingredients[1]),
+        ):
+            with self.subTest(route=route):
+                status, data = await self.assert_same(route, instance.pk)
+                self.assertEqual(status, 200)
+                self.assertEqual(
+                    (data['id'], data['name']), (instance.pk, instance.name)
+                )
+
+    async def test_missing_object_is_not_found(self):
+        for route in ('tags-detail', 'ingredients-detail'):
+            for pk in (10 ** 6, 'abc', 2 ** 63):
+                with self.subTest(route=route, pk=pk):
+                    status, data = await self.assert_same(route, pk)
+                    self.assertEqual(status, 404)
+                    self.assertIn('detail', data)
+
+    async def test_other_methods_fall_back_to_sync(self):
+        responses = {}
+        for namespace in NAMESPACES:
+            path = reverse(f'{namespace}:tags-list')
+            post = await self.async_client.post(path, {})
+            head = await self.async_client.head(path)
+            responses[namespace] = (
+                post.status_code, post.json(), head.status_code, head.content
+            )
+        self.assertEqual(responses['async'], responses['sync'])
+        self.assertEqual(responses['async'][2:], (200, b''))
@@ -0,0 +1,71 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from recipe.models import Cart, ShoppingListItem
+from recipe.shopping_list import calculate_shopping_lists
+from tests.utils import (count_queries, create_ingredients, create_recipes,
+                         create_tags, create_user, get_client,
+                         refresh_derived_data)
+
+
+class BulkShoppingCartTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = create_user('viewer')
+        author = create_user('author')
+        tags = create_tags(1)
+        ingredients = create_ingredients(6)
+        cls.recipes = [
+            *create_recipes(author, 3, ingredients[:4], tags, 'first'),
+            *create_recipes(author, 3, ingredients[2:], tags, 'second'),
+        ]
+        Cart.objects.create(author=cls.viewer, recipe=cls.recipes[0])
+        refresh_derived_data()
+
+    def setUp(self):
+        self.client = get_client(self.viewer)
+        self.path = reverse('recipes-bulk-shopping-cart')
+
+    def assert_shopping_list(self):
+        self.assertEqual(
+            {
+                (item.user_id, item.ingredient_id): item.total_amount
+                for item in ShoppingListItem.objects.all()
+            },
+            calculate_shopping_lists()
+        )
+
+    def send(self, method, recipes):
+        response, queries = count_queries(
+            self.client, method, self.path,
+            {'recipes': [recipe.id for recipe in recipes]}
+        )
+        table = ShoppingListItem._meta.db_table
+        self.assertFalse([
+            query['sql'] for query in queries
+            if query['sql'].startswith(f'DELETE FROM "{table}"')
+            and 'total_amount' not in query['sql']
+        ])
+        return response
+
+    def test_bulk_add_applies_only_new_recipes(self):
+        response = self.send('post', self.recipes[:4])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 4)
+        self.assertEqual(self.viewer.carts.count(), 4)
+        self.assert_shopping_list()
+        self.send('post', self.recipes[2:])
+        self.assertEqual(self.viewer.carts.count(), 6)
+        self.assert_shopping_list()
+
+    def test_bulk_delete_applies_only_deleted_recipes(self):
+        self.send('post', self.recipes)
+        response = self.send('delete', self.recipes[1:3])
+        self.assertEqual(response.status_code, 204)
+        self.assert_shopping_list()
+        self.send('delete', self.recipes[:3])
+        self.assertEqual(self.viewer.carts.count(), 3)
+        self.assert_shopping_list()
+        self.send('delete', self.recipes)
+        self.assertFalse(ShoppingListItem.objects.exists())
@@ -0,0 +1,106 @@
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipUnless
+
+from django.db import connection, connections
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from recipe.counters import drifted_counters, recount_counters
+from recipe.models import Recipe, ShoppingListItem
+from recipe.shopping_list import calculate_shopping_lists
+from tests.utils import (create_ingredients, create_recipes, create_tags,
+                         create_user, get_client)
+from user.models import User
+
+THREADS = 8
+ROUNDS = 3
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Races need PostgreSQL')
+class ConcurrentTogglesTest(TransactionTestCase):
+
+    def setUp(self):
+        self.author = create_user('author')
+        self.viewers = [create_user(f'viewer{i}') for i in range(THREADS)]
+        self.recipe = create_recipes(
+            self.author, 1, create_ingredients(3), create_tags(1)
+        )[0]
+        recount_counters(User, [self.author.pk], 'recipes_count')
+        self.paths = {
+            'favorite': reverse(
+                'recipes-favorite', kwargs={'pk': self.recipe.pk}
+            ),
+            'shopping_cart': reverse(
+                'recipes-shopping-cart', kwargs={'pk': self.recipe.pk}
+            ),
+            'subscribe': reverse(
+                'user-subscribe', kwargs={'id': self.author.pk}
+            ),
+        }
+
+    def send(self, barrier, method, path, user):
+        client = get_client(user)
+        client.raise_request_exception = False
+        try:
+            barrier.wait()
+            return getattr(client, method)(path).status_code
+        finally:
+            connections.close_all()
+
+    def run_parallel(self, method, path, users):
+        barrier = threading.Barrier(len(users))
+        with ThreadPoolExecutor(len(users)) as executor:
+            return Counter(executor.map(
+                lambda user: self.send(barrier, method, path, user), users
+            ))
+
+    def assert_consistent(self):
+        users = [user.pk for user in (self.author, *self.viewers)]
+        self.assertFalse(
+            drifted_counters(User).filter(pk__in=users).exists()
+        )
+        self.assertFalse(
+            drifted_counters(Recipe).filter(pk=self.recipe.pk).exists()
+        )
+        viewer_ids = {user.pk for user in self.viewers}
+        items = {
+            (item.user_id, item.ingredient_id): item.total_amount
+            for item in ShoppingListItem.objects.filter(user__in=self.viewers)
+        }
+        self.assertEqual(items, {
+            key: amount for key, amount in calculate_shopping_lists().items()
+            if key[0] in viewer_ids
+        })
+
+    def test_one_user_toggles_succeed_once(self):
+        same = [self.viewers[0]] * THREADS
+        for _ in range(ROUNDS):
+            for name, path in self.paths.items():
+                with self.subTest(toggle=name):
+                    self.assertEqual(
+                        self.run_parallel('post', path, same),
+                        Counter({201: 1, 400: THREADS - 1})
+                    )
+                    self.assert_consistent()
+                    self.assertEqual(
+                        self.run_parallel('delete', path, same),
+                        Counter({204: 1, 400: THREADS - 1})
+                    )
+                    self.assert_consistent()
+
+    def test_many_users_toggles_succeed(self):
+        for _ in range(ROUNDS):
+            for name, path in self.paths.items():
+                with self.subTest(toggle=name):
+                    self.assertEqual(
+                        self.run_parallel('post', path, self.viewers),
+                        Counter({201: THREADS})
+                    )
+                    self.assert_consistent()
+                    self.assertEqual(
+                        self.run_parallel('delete', path, self.viewers),
+                        Counter({204: THREADS})
+                    )
+                    self.assert_consistent()
@@ -0,0 +1,108 @@
+from urllib.parse import parse_qs, urlsplit
+
+from django.test import TestCase
+from django.urls import reverse
+
+from tests.utils import (create_ingredients, create_recipes, create_tags,
+                         create_user, get_client, refresh_derived_data)
+
+
+class CookableRecipesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user('cook')
+        tags = create_tags(1)
+        cls.ingredients = create_ingredients(5)
+        first, second, third, fourth = cls.ingredients[:4]
+        cls.recipes = {
+            name: create_recipes(cls.user, 1, ingredients, tags, name)[0]
+            for name, ingredients in (
+                ('full', (first, second)),
+                ('two_of_three', (first, second, third)),
+                ('one_of_two', (first, fourth)),
+                ('none', (third, fourth)),
+            )
+        }
+        refresh_derived_data()
+
+    def setUp(self):
+        self.client = get_client(self.user)
+
+    def get(self, ingredients, **params):
+        return self.client.get(
+            reverse('recipes-cookable'),
+            {'ingredients': ingredients, 'limit': 10, **params}
+        )
+
+    def get_found(self, response):
+        self.assertEqual(response.status_code, 200, response.data)
+        return [
+            (
+                recipe['id'], recipe['ingredients_covered'],
+                recipe['ingredients_missing']
+            )
+            for recipe in response.data['results']
+        ]
+
+    def assert_found(self, response, expected):
+        self.assertEqual(
+            self.get_found(response),
+            [
+                (self.recipes[name].pk, covered, missing)
+                for name, covered, missing in expected
+            ]
+        )
+
+    def test_partial_coverage_is_ordered_by_covered_count(self):
+        first, second = self.ingredients[:2]
+        self.assert_found(self.get([first.pk, second.pk]), [
+            ('full', 2, 0),
+            ('two_of_three', 2, 1),
+            ('one_of_two', 1, 1),
+        ])
+
+    def test_cursor_pages_keep_the_order(self):
+        first, second = self.ingredients[:2]
+        expected = self.get_found(self.get([first.pk, second.pk]))
+        found, cursor = [], ''
+        while cursor is not None:
+            response = self.get(
+                [first.pk, second.pk], limit=1, cursor=cursor
+            )
+            found += self.get_found(response)
+            cursor = response.data['next'] and parse_qs(
+                urlsplit(response.data['next']).query
+            )['cursor'][0]
+        self.assertEqual(found, expected)
+
+    def test_full_coverage(self):
+        first, second = self.ingredients[:2]
+        self.assert_found(
+            self.get([first.pk, second.pk], full='true'), [('full', 2, 0)]
+        )
+        self.assert_found(
+            self.get([ingredient.pk for ingredient in self.ingredients],
+                     full='1'),
+            [
+                ('two_of_three', 3, 0),
+                ('none', 2, 0),
+                ('one_of_two', 2, 0),
+                ('full', 2, 0),
+            ]
+        )
+
+    def test_no_coverage(self):
+        unused = self.ingredients[4]
+        self.assert_found(self.get([unused.pk]), [])
+        self.assert_found(self.get([unused.pk], full='true'), [])
+
+    def test_invalid_ingredients(self):
+        for ingredients in (
+            [], [''], ['abc'], ['0'], ['-1'], ['1.5'], ['١'],
+            [str(2 ** 63)], [str(self.ingredients[0].pk), 'abc'],
+        ):
+            with self.subTest(ingredients=ingredients):
+                response = self.get(ingredients)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
@@ -0,0 +1,52 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from ingredient.models import Ingredient
+from recipe.models import Cart, Favorite
+from tests.utils import (create_ingredients, create_recipes, create_tags,
+                         create_user, refresh_derived_data)
+from user.models import Follow
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN needs PostgreSQL')
+class ExplainQueriesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [create_user(f'user{i}') for i in range(20)]
+        tags = create_tags(3)
+        ingredients = create_ingredients(30) + [
+            Ingredient.objects.create(name='мука', measurement_unit='г')
+        ]
+        recipes = []
+        for number in range(20):
+            for i, user in enumerate(users):
+                recipes += create_recipes(
+                    user, 1, ingredients[i:i + 5], tags[i % 3:i % 3 + 1],
+                    f'user{i} курица {number} '
+                )
+        Follow.objects.bulk_create([
+            Follow(user=author, following=user)
+            for i, user in enumerate(users) for author in users[i + 1:i + 6]
+        ])
+        for model in (Favorite, Cart):
+            model.objects.bulk_create([
+                model(author=user, recipe=recipe)
+                for i, user in enumerate(users)
+                for recipe in recipes[i * 7:i * 7 + 10]
+            ])
+        refresh_derived_data()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_hot_queries_use_indexes(self):
+        output = StringIO()
+        try:
+            call_command('explain_queries', stdout=output)
+        except CommandError as error:
+            self.fail(f'{error}\n{output.getvalue()}')
@@ -0,0 +1,92 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from api.cache import load_reference_version
+from ingredient.models import Ingredient
+from recipe.models import Tag
+
+BASE_DIR = tempfile.mkdtemp()
+INGREDIENTS = [
+    ('морковь', 'г'),
+    ('молоко', 'мл'),
+    ('соль, каменная', 'по вкусу'),
+]
+TAGS = [
+    {'name': 'Завтрак', 'color': '#E26C2D', 'slug': 'breakfast'},
+    {'name': 'Обед', 'color': '#49B64E', 'slug': 'lunch'},
+    {'name': 'Ужин', 'color': '#8775D2', 'slug': 'dinner'},
+]
+
+
+@override_settings(BASE_DIR=BASE_DIR)
+class ImportCsvTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        data = Path(BASE_DIR) / 'data'
+        data.mkdir()
+        with open(data / 'ingredients.csv', 'w', encoding='utf-8') as file:
+            file.writelines(
+                f'"{name}",{unit}\n' for name, unit in INGREDIENTS
+            )
+        with open(data / 'tags.json', 'w', encoding='utf-8') as file:
+            json.dump(TAGS, file, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(BASE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def import_file(self, filename, app_name, model_name):
+        version = load_reference_version()
+        output = StringIO()
+        call_command(
+            'importcsv', filename=filename, app_name=app_name,
+            model_name=model_name, batch_size=2, stdout=output
+        )
+        self.assertGreater(load_reference_version(), version)
+        return output.getvalue().splitlines()[-1]
+
+    def test_csv_import_is_idempotent(self):
+        for summary in (
+            'ingredient: 3 inserted, 0 updated, 0 unchanged',
+            'ingredient: 0 inserted, 0 updated, 3 unchanged',
+        ):
+            self.assertEqual(
+                self.import_file('ingredients.csv', 'ingredient', 'ingredient'),
+                summary
+            )
+            self.assertEqual(
+                sorted(Ingredient.objects.values_list(
+                    'name', 'measurement_unit'
+                )),
+                sorted(INGREDIENTS)
+            )
+
+    @mock.patch('api.management.commands.importcsv.JSON_CHUNK_SIZE', 16)
+    def test_json_import_is_idempotent(self):
+        Tag.objects.create(name='Старый', color='#000000', slug='lunch')
+        for summary in (
+            'tag: 2 inserted, 1 updated, 0 unchanged',
+            'tag: 0 inserted, 0 updated, 3 unchanged',
+        ):
+            self.assertEqual(
+                self.import_file('tags.json', 'recipe', 'tag'), summary
+            )
+            self.assertEqual(
+                sorted(Tag.objects.values('name', 'color', 'slug'),
+                       key=lambda tag: tag['slug']),
+                sorted(TAGS, key=lambda tag: tag['slug'])
+            )
@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from api.cache import bump_reference_version
+from api.ingredient_search import IngredientIndex
+from ingredient.models import Ingredient
+
+
+class IngredientIndexTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Ingredient.objects.bulk_create([
+            Ingredient(name=name, measurement_unit=unit)
+            for name, unit in (
+                ('Мука', 'г'), ('Мускат', 'г'), ('Сахар', 'г'),
+                ('Рисовая мука', 'г'), ('Мука', 'кг'),
+            )
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.index = IngredientIndex()
+
+    def names(self, *args):
+        return [
+            (ingredient['name'], ingredient['measurement_unit'])
+            for ingredient in self.index.search(*args)
+        ]
+
+    def test_prefix_matches_go_first(self):
+        self.assertEqual(self.names('му'), [
+            ('Мука', 'г'), ('Мука', 'кг'), ('Мускат', 'г'),
+            ('Рисовая мука', 'г'),
+        ])
+        self.assertEqual(self.names('МУКА', 'кг'), [('Мука', 'кг')])
+        self.assertEqual(self.names('соль'), [])
+
+    def test_rebuilds_one_snapshot_on_version_change(self):
+        keys, rows = self.index.refresh()
+        self.assertEqual(keys, tuple(row[0] for row in rows))
+        Ingredient.objects.create(name='Мёд', measurement_unit='г')
+        self.assertIs(self.index.refresh()[0], keys)
+        bump_reference_version()
+        new_keys, new_rows = self.index.refresh()
+        self.assertEqual(len(new_keys), len(keys) + 1)
+        self.assertEqual(new_keys, tuple(row[0] for row in new_rows))
+        self.assertEqual(self.names('мё'), [('Мёд', 'г')])
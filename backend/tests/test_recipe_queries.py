@@ -0,0 +1,94 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from recipe.models import Cart, Favorite
+from tests.utils import (count_queries, create_ingredients, create_recipes,
+                         create_tags, create_user, get_client,
+                         refresh_derived_data)
+from user.models import Follow
+
+
+class RecipeListQueriesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = create_user('viewer')
+        cls.author = create_user('author')
+        cls.other = create_user('other')
+        tags = create_tags(3)
+        ingredients = create_ingredients(15)
+        cls.recipes = (
+            create_recipes(cls.author, 50, ingredients, tags, 'author')
+            + create_recipes(cls.other, 50, ingredients, tags, 'other')
+        )
+        Follow.objects.create(user=cls.author, following=cls.viewer)
+        Favorite.objects.bulk_create([
+            Favorite(author=cls.viewer, recipe=recipe)
+            for recipe in cls.recipes[::2]
+        ])
+        Cart.objects.bulk_create([
+            Cart(author=cls.viewer, recipe=recipe)
+            for recipe in cls.recipes[::3]
+        ])
+        refresh_derived_data()
+
+    def get_page(self, client, limit, **params):
+        response, queries = count_queries(
+            client, 'get', reverse('recipes-list'), {'limit': limit, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data['results'], queries
+
+    def assert_constant_queries(self, client, **params):
+        _, expected = self.get_page(client, 1, **params)
+        for limit in (5, 20, 100):
+            with self.subTest(limit=limit, **params):
+                results, queries = self.get_page(client, limit, **params)
+                self.assertEqual(len(results), limit)
+                self.assertEqual(
+                    len(queries), len(expected),
+                    '\n'.join(query['sql'] for query in queries)
+                )
+
+    def test_list_queries_do_not_depend_on_limit(self):
+        self.assert_constant_queries(get_client(self.viewer))
+        self.assert_constant_queries(get_client(self.viewer), cursor='')
+        self.assert_constant_queries(get_client())
+
+    def test_list_flags_are_annotated(self):
+        favorites = {recipe.pk for recipe in self.recipes[::2]}
+        carts = {recipe.pk for recipe in self.recipes[::3]}
+        results, _ = self.get_page(get_client(self.viewer), 100)
+        for recipe in results:
+            self.assertEqual(recipe['is_favorited'], recipe['id'] in favorites)
+            self.assertEqual(
+                recipe['is_in_shopping_cart'], recipe['id'] in carts
+            )
+            self.assertEqual(
+                recipe['author']['is_subscribed'],
+                recipe['author']['id'] == self.author.pk
+            )
+
+    def test_page_of_100_recipes_with_15_ingredients(self):
+        results, queries = self.get_page(get_client(self.viewer), 100)
+        self.assertEqual(len(results), 100)
+        for recipe in results:
+            self.assertEqual(len(recipe['ingredients']), 15)
+            self.assertEqual(len(recipe['tags']), 3)
+        self.assertLessEqual(
+            len(queries), 10, '\n'.join(query['sql'] for query in queries)
+        )
+
+    def test_detail_queries(self):
+        client = get_client(self.viewer)
+        _, expected = count_queries(
+            client, 'get',
+            reverse('recipes-detail', kwargs={'pk': self.recipes[0].pk})
+        )
+        response, queries = count_queries(
+            client, 'get',
+            reverse('recipes-detail', kwargs={'pk': self.recipes[-1].pk})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['ingredients']), 15)
+        self.assertEqual(len(queries), len(expected))
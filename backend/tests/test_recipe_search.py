@@ -0,0 +1,87 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from api.management.commands.check_query_counts import png_base64
+from recipe.models import Recipe
+from tests.utils import (count_queries, create_ingredients, create_tags,
+                         create_user, get_client)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RecipeSearchFieldsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.tags = create_tags(2)
+        cls.ingredients = create_ingredients(3, 'морковь')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = get_client(self.author)
+
+    def send(self, method, path, data):
+        response, queries = count_queries(self.client, method, path, data)
+        self.assertIn(response.status_code, (200, 201), response.data)
+        table = Recipe._meta.db_table
+        refreshes = [
+            query['sql'] for query in queries
+            if query['sql'].startswith(
+                f'UPDATE "{table}" SET "search_vector"'
+            )
+        ]
+        return response, refreshes
+
+    def create_recipe(self):
+        response, refreshes = self.send('post', reverse('recipes-list'), {
+            'name': 'Суп',
+            'text': 'Горячий',
+            'cooking_time': 5,
+            'image': png_base64(),
+            'tags': [tag.pk for tag in self.tags],
+            'ingredients': [
+                {'id': ingredient.pk, 'amount': 2}
+                for ingredient in self.ingredients[:2]
+            ],
+        })
+        return Recipe.objects.get(pk=response.data['id']), refreshes
+
+    def assert_found(self, text, recipe):
+        response = self.client.get(reverse('recipes-list'), {'search': text})
+        self.assertEqual(
+            [found['id'] for found in response.data['results']], [recipe.pk]
+        )
+
+    def test_create_refreshes_search_fields_once(self):
+        recipe, refreshes = self.create_recipe()
+        self.assertEqual(len(refreshes), 1)
+        self.assertEqual(
+            recipe.ingredient_ids,
+            [ingredient.pk for ingredient in self.ingredients[:2]]
+        )
+        self.assert_found('морковь0', recipe)
+
+    def test_update_refreshes_search_fields_when_needed(self):
+        recipe, _ = self.create_recipe()
+        path = reverse('recipes-detail', kwargs={'pk': recipe.pk})
+        _, refreshes = self.send('patch', path, {'cooking_time': 10})
+        self.assertEqual(refreshes, [])
+        _, refreshes = self.send('patch', path, {'name': 'Борщ'})
+        self.assertEqual(len(refreshes), 1)
+        self.assert_found('борщ', recipe)
+        _, refreshes = self.send('patch', path, {
+            'ingredients': [{'id': self.ingredients[2].pk, 'amount': 3}]
+        })
+        self.assertEqual(len(refreshes), 1)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.ingredient_ids, [self.ingredients[2].pk])
+        self.assert_found('морковь2', recipe)
@@ -0,0 +1,114 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from recipe.models import Cart, IngredientRecipe, ShoppingListItem
+from recipe.shopping_list import calculate_shopping_lists
+from tests.utils import (count_queries, create_ingredients, create_recipes,
+                         create_tags, create_user, get_client,
+                         refresh_derived_data)
+
+
+class RecipeUpdateTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.viewer = create_user('viewer')
+        cls.tags = create_tags(2)
+        cls.ingredients = create_ingredients(4)
+        cls.recipe, cls.other = create_recipes(
+            cls.author, 2, cls.ingredients[:3], cls.tags[:1]
+        )
+        Cart.objects.bulk_create([
+            Cart(author=cls.viewer, recipe=recipe)
+            for recipe in (cls.recipe, cls.other)
+        ])
+        refresh_derived_data()
+
+    def setUp(self):
+        self.client = get_client(self.author)
+        self.path = reverse('recipes-detail', kwargs={'pk': self.recipe.pk})
+
+    def get_rows(self):
+        return {
+            row.ingredient_id: (row.pk, row.amount)
+            for row in self.recipe.ingredient_recipes.all()
+        }
+
+    def get_totals(self):
+        return dict(
+            ShoppingListItem.objects.filter(user=self.viewer).values_list(
+                'ingredient', 'total_amount'
+            )
+        )
+
+    def patch(self, data):
+        response, queries = count_queries(
+            self.client, 'patch', self.path, data
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        table = IngredientRecipe._meta.db_table
+        return [
+            statement for statement in ('INSERT', 'UPDATE', 'DELETE')
+            for query in queries
+            if query['sql'].startswith((
+                f'{statement} "{table}"', f'{statement} INTO "{table}"',
+                f'{statement} FROM "{table}"'
+            ))
+        ]
+
+    def test_patch_without_ingredients_keeps_them(self):
+        rows, totals = self.get_rows(), self.get_totals()
+        writes = self.patch({
+            'name': 'Борщ', 'tags': [tag.pk for tag in self.tags]
+        })
+        self.assertEqual(writes, [])
+        self.assertEqual(self.get_rows(), rows)
+        self.assertEqual(self.get_totals(), totals)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.name, 'Борщ')
+        self.assertEqual(
+            set(self.recipe.tags.values_list('pk', flat=True)),
+            {tag.pk for tag in self.tags}
+        )
+
+    def test_same_ingredients_are_not_rewritten(self):
+        rows, totals = self.get_rows(), self.get_totals()
+        writes = self.patch({'ingredients': [
+            {'id': ingredient_id, 'amount': amount}
+            for ingredient_id, (_, amount) in rows.items()
+        ]})
+        self.assertEqual(writes, [])
+        self.assertEqual(self.get_rows(), rows)
+        self.assertEqual(self.get_totals(), totals)
+
+    def test_ingredient_change_applies_the_delta(self):
+        first, second, third, fourth = self.ingredients
+        rows, totals = self.get_rows(), self.get_totals()
+        writes = self.patch({'ingredients': [
+            {'id': first.pk, 'amount': rows[first.pk][1]},
+            {'id': second.pk, 'amount': rows[second.pk][1] + 3},
+            {'id': fourth.pk, 'amount': 4},
+        ]})
+        self.assertEqual(writes, ['INSERT', 'UPDATE', 'DELETE'])
+        new_rows = self.get_rows()
+        self.assertEqual(new_rows[first.pk], rows[first.pk])
+        self.assertEqual(
+            new_rows[second.pk],
+            (rows[second.pk][0], rows[second.pk][1] + 3)
+        )
+        self.assertNotIn(third.pk, new_rows)
+        self.assertEqual(new_rows[fourth.pk][1], 4)
+        self.assertEqual(self.get_totals(), {
+            first.pk: totals[first.pk],
+            second.pk: totals[second.pk] + 3,
+            third.pk: totals[third.pk] - rows[third.pk][1],
+            fourth.pk: 4,
+        })
+        self.assertEqual(
+            {
+                (item.user_id, item.ingredient_id): item.total_amount
+                for item in ShoppingListItem.objects.all()
+            },
+            calculate_shopping_lists()
+        )
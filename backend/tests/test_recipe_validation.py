@@ -0,0 +1,62 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from ingredient.models import Ingredient
+from tests.utils import (count_queries, create_ingredients, create_recipes,
+                         create_tags, create_user, get_client)
+
+
+class RecipeIngredientValidationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user('author')
+        cls.ingredients = create_ingredients(5)
+        cls.recipe, = create_recipes(
+            cls.author, 1, cls.ingredients[:1], create_tags(1)
+        )
+
+    def setUp(self):
+        self.client = get_client(self.author)
+
+    def patch(self, ingredient_ids):
+        response, queries = count_queries(
+            self.client, 'patch',
+            reverse('recipes-detail', kwargs={'pk': self.recipe.pk}),
+            {'ingredients': [
+                {'id': pk, 'amount': 1} for pk in ingredient_ids
+            ]}
+        )
+        table = Ingredient._meta.db_table
+        lookups = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT')
+            and f'FROM "{table}"' in query['sql']
+        ]
+        return response, lookups
+
+    def test_unknown_ingredients_are_reported_together(self):
+        last = Ingredient.objects.order_by('pk').last().pk
+        unknown = [last + 3, last + 1, last + 2]
+        response, lookups = self.patch(
+            [self.ingredients[0].pk, unknown[0], unknown[1], unknown[0],
+             unknown[2]]
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['ingredients'], [
+            f'Ингредиентов с id {", ".join(map(str, unknown))} не существует'
+        ])
+        self.assertEqual(len(lookups), 1)
+
+    def test_known_ingredients_are_looked_up_once(self):
+        response, lookups = self.patch(
+            [ingredient.pk for ingredient in self.ingredients]
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(len(lookups), 1)
+        self.assertEqual(
+            sorted(self.recipe.ingredient_recipes.values_list(
+                'ingredient', flat=True
+            )),
+            [ingredient.pk for ingredient in self.ingredients]
+        )
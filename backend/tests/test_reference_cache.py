@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ingredient.models import Ingredient
+from recipe.models import Tag
+from tests.utils import create_ingredients, create_tags
+
+ROUTES = ('tags-list', 'tags-detail', 'ingredients-list', 'ingredients-detail')
+
+
+@override_settings(ROOT_URLCONF='tests.urls')
+class ReferenceCacheTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tag, = create_tags(1)
+        cls.ingredient, = create_ingredients(1)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_path(self, namespace, route):
+        if not route.endswith('-detail'):
+            return reverse(f'{namespace}:{route}')
+        instance = self.tag if route.startswith('tags') else self.ingredient
+        return reverse(f'{namespace}:{route}', args=[instance.pk])
+
+    def get(self, namespace, route, **headers):
+        return self.client.get(
+            self.get_path(namespace, route), headers=headers
+        )
+
+    async def aget(self, namespace, route, **headers):
+        return await self.async_client.get(
+            self.get_path(namespace, route), headers=headers
+        )
+
+    def assert_not_modified(self, response, etag):
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_matching_etag_is_not_modified(self):
+        for route in ROUTES:
+            with self.subTest(route=route):
+                response = self.get('sync', route)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.has_header('Last-Modified'))
+                self.assert_not_modified(
+                    self.get('sync', route, if_none_match=response['ETag']),
+                    response['ETag']
+                )
+                self.assert_not_modified(
+                    self.get(
+                        'sync', route,
+                        if_modified_since=response['Last-Modified']
+                    ),
+                    response['ETag']
+                )
+
+    def test_reference_change_bumps_the_version(self):
+        for model, route, name in (
+            (Tag, 'tags-list', 'Завтрак'),
+            (Ingredient, 'ingredients-list', 'Морковь'),
+        ):
+            with self.subTest(model=model.__name__):
+                etag = self.get('sync', route)['ETag']
+                instance = model.objects.get()
+                instance.name = name
+                with self.captureOnCommitCallbacks(execute=True):
+                    instance.save()
+                response = self.get('sync', route, if_none_match=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+                self.assertEqual(
+                    [item['name'] for item in response.json()], [name]
+                )
+
+    async def test_async_path_returns_the_same_headers(self):
+        for route in ROUTES:
+            with self.subTest(route=route):
+                response = await self.aget('async', route)
+                expected = await self.aget('sync', route)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected.json())
+                for header in ('ETag', 'Last-Modified'):
+                    self.assertEqual(response[header], expected[header])
+                self.assert_not_modified(
+                    await self.aget(
+                        'async', route, if_none_match=response['ETag']
+                    ),
+                    response['ETag']
+                )
@@ -0,0 +1,89 @@
+import csv
+import io
+import re
+
+from django.test import TestCase
+from django.urls import reverse
+
+from foodgram.constants import SHOPPING_LIST_PDF_LINES_PER_PAGE
+from recipe.models import Cart, ShoppingListItem
+from tests.utils import (create_ingredients, create_recipes, create_tags,
+                         create_user, get_client, refresh_derived_data)
+
+
+class ShoppingListExportTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = create_user('author')
+        cls.viewer = create_user('viewer')
+        ingredients = create_ingredients(
+            SHOPPING_LIST_PDF_LINES_PER_PAGE + 5, 'Морковь ёж №'
+        )
+        recipes = create_recipes(author, 2, ingredients, create_tags(1))
+        Cart.objects.bulk_create([
+            Cart(author=cls.viewer, recipe=recipe) for recipe in recipes
+        ])
+        refresh_derived_data()
+        cls.items = list(
+            ShoppingListItem.objects.filter(user=cls.viewer).order_by(
+                'ingredient__name'
+            ).values_list(
+                'ingredient__name', 'total_amount',
+                'ingredient__measurement_unit'
+            )
+        )
+
+    def setUp(self):
+        self.client = get_client(self.viewer)
+
+    def download(self, file_format, content_type):
+        response = self.client.get(
+            reverse('recipes-download-shopping-cart'), {'format': file_format}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], content_type)
+        self.assertEqual(
+            response['Content-Disposition'],
+            f'attachment; filename="shopping_list.{file_format}"'
+        )
+        return b''.join(response.streaming_content)
+
+    def test_txt(self):
+        content = self.download('txt', 'text/plain; charset=utf-8')
+        self.assertEqual(
+            content.decode('utf8').splitlines(),
+            [
+                f'{number}. {name} {amount} {unit}'
+                for number, (name, amount, unit)
+                in enumerate(self.items, 1)
+            ]
+        )
+
+    def test_csv(self):
+        content = self.download('csv', 'text/csv; charset=utf-8')
+        rows = list(csv.reader(io.StringIO(content.decode('utf8'))))
+        self.assertEqual(
+            rows[0], ['Ингредиент', 'Количество', 'Единица измерения']
+        )
+        self.assertEqual(
+            rows[1:],
+            [[name, str(amount), unit] for name, amount, unit in self.items]
+        )
+
+    def test_pdf(self):
+        content = self.download('pdf', 'application/pdf')
+        self.assertTrue(content.startswith(b'%PDF-1.4\n'))
+        self.assertTrue(content.endswith(b'%%EOF\n'))
+        xref = int(re.search(rb'startxref\n(\d+)\n', content).group(1))
+        self.assertTrue(content[xref:].startswith(b'xref\n'))
+        self.assertIn(b'/Count 2 ', content)
+        self.assertIn(b'/Encoding /Identity-H', content)
+        self.assertIn(b'/FontFile2', content)
+        self.assertNotIn(b'/Helvetica', content)
+        to_unicode = content[content.index(b'beginbfchar'):]
+        for character in 'Морковьёж№':
+            self.assertIn(
+                f'<{character.encode("utf-16-be").hex().upper()}>'.encode(),
+                to_unicode
+            )
@@ -0,0 +1,21 @@
+from django.test import override_settings
+from django.urls import include, path
+from rest_framework import routers
+
+from api.views import IngredientView, TagView
+
+
+def get_reference_urls(async_views):
+    # ASYNC_VIEWS is read when the router builds the views.
+    router = routers.SimpleRouter()
+    router.register('tags', TagView, basename='tags')
+    router.register('ingredients', IngredientView, basename='ingredients')
+    with override_settings(ASYNC_VIEWS=async_views):
+        return router.urls
+
+
+urlpatterns = [
+    path('api/', include('api.urls')),
+    path('async/', include((get_reference_urls(True), 'async'))),
+    path('sync/', include((get_reference_urls(False), 'sync'))),
+]
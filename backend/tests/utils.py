@@ -0,0 +1,95 @@
+from django.db import connection
+from django.forms import FileField
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ingredient.models import Ingredient
+from recipe.counters import COUNTERS, reconcile_counters
+from recipe.models import IngredientRecipe, Recipe, Tag
+from recipe.search import update_search_fields
+from recipe.shopping_list import rebuild_shopping_lists
+from user.models import User
+
+PASSWORD = 'Test-password-12345'
+
+
+def create_user(name):
+    return User.objects.create_user(
+        username=name, email=f'{name}@test.ru', first_name=name,
+        last_name=name, password=PASSWORD
+    )
+
+
+def create_tags(count, prefix='tag'):
+    return Tag.objects.bulk_create([
+        Tag(name=f'{prefix}{i}', color=f'#{i:06x}', slug=f'{prefix}{i}')
+        for i in range(count)
+    ])
+
+
+def create_ingredients(count, prefix='ingredient'):
+    return Ingredient.objects.bulk_create([
+        Ingredient(name=f'{prefix}{i}', measurement_unit='г')
+        for i in range(count)
+    ])
+
+
+def create_recipes(author, count, ingredients, tags, prefix='recipe'):
+    recipes = Recipe.objects.bulk_create([
+        Recipe(
+            author=author, name=f'{prefix}{i}', text=f'{prefix}{i}',
+            cooking_time=i + 1, image=f'recipe_img/{prefix}{i}.png'
+        )
+        for i in range(count)
+    ])
+    Recipe.tags.through.objects.bulk_create([
+        Recipe.tags.through(recipe=recipe, tag=tag)
+        for recipe in recipes for tag in tags
+    ])
+    IngredientRecipe.objects.bulk_create([
+        IngredientRecipe(recipe=recipe, ingredient=ingredient, amount=i + j + 1)
+        for i, recipe in enumerate(recipes)
+        for j, ingredient in enumerate(ingredients)
+    ])
+    return recipes
+
+
+def refresh_derived_data():
+    update_search_fields(Recipe.objects.values('pk'))
+    for model in COUNTERS:
+        reconcile_counters(model)
+    rebuild_shopping_lists()
+
+
+def get_client(user=None):
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user)
+    return client
+
+
+def count_queries(client, method, path, data=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = getattr(client, method)(path, data, format='json')
+        if response.streaming:
+            b''.join(response.streaming_content)
+    return response, queries
+
+
+def get_form_data(form):
+    data = {}
+    for name, field in form.fields.items():
+        value = form[name].value()
+        if isinstance(field, FileField) or value is None or value is False:
+            continue
+        data[form.add_prefix(name)] = 'on' if value is True else value
+    return data
+
+
+def get_admin_form_data(response):
+    data = get_form_data(response.context['adminform'].form)
+    for inline in response.context['inline_admin_formsets']:
+        data.update(get_form_data(inline.formset.management_form))
+        for form in inline.formset.forms:
+            data.update(get_form_data(form))
+    return data
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
+from recipe.admin import CounterAdminMixin
 from user.models import Follow, User
 
 
@@ -14,13 +15,15 @@ class UserAdmin(BaseUserAdmin):
         'date_joined',
         'is_superuser',
         'is_active',
+        'recipes_count',
+        'followers_count',
     )
     search_fields = ('id', 'username', 'email')
     list_filter = ('email', 'username', )
 
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(CounterAdminMixin, admin.ModelAdmin):
     list_display = (
         'id',
         'user',
@@ -28,3 +31,7 @@ class FollowAdmin(admin.ModelAdmin):
     )
     search_fields = ('id', 'user__name')
     list_filter = ('user',)
+    tracked_fields = ('following_id', 'user_id')
+    counter_model = User
+    counter_field = 'followers_count'
+    counter_values = {}
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.11 on 2026-10-18 19:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('user', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='follow',
+            index=models.Index(fields=['following', 'user'], name='follow_following_user_idx'),
+        ),
+    ]
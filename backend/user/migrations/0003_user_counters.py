@@ -0,0 +1,42 @@
+# Generated by Django 4.2.11 on 2026-10-18 19:49
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_rows(model, field):
+    rows = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+        field
+    ).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(rows), Value(0))
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model('user', 'User')
+    User.objects.update(
+        recipes_count=count_rows(apps.get_model('recipe', 'Recipe'), 'author'),
+        followers_count=count_rows(apps.get_model('user', 'Follow'), 'user')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0006_recipe_counters'),
+        ('user', '0002_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Подписчиков'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Рецептов'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
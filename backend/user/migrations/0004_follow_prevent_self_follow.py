@@ -0,0 +1,29 @@
+# Generated by Django 4.2.11 on 2026-10-18 21:45
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def delete_self_follows(apps, schema_editor):
+    User = apps.get_model('user', 'User')
+    Follow = apps.get_model('user', 'Follow')
+    follows = Follow.objects.filter(user=F('following'))
+    User.objects.filter(
+        pk__in=follows.values('user'), followers_count__gt=0
+    ).update(followers_count=F('followers_count') - 1)
+    follows.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_user_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_self_follows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.CheckConstraint(check=models.Q(('user', models.F('following')), _negated=True), name='prevent_self_follow'),
+        ),
+    ]
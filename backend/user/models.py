@@ -18,6 +18,12 @@ class User(AbstractUser):
     last_name = models.CharField(
         'Фамилия', max_length=constants.MAX_LENGTH_USER, unique=True
     )
+    recipes_count = models.PositiveIntegerField(
+        'Рецептов', default=0, editable=False
+    )
+    followers_count = models.PositiveIntegerField(
+        'Подписчиков', default=0, editable=False
+    )
 
     class Meta:
         ordering = ['username']
@@ -45,7 +51,14 @@ class Follow(models.Model):
         verbose_name_plural = 'Подписчики'
         constraints = [
             models.UniqueConstraint(fields=['user', 'following'],
-                                    name='unique_follow')
+                                    name='unique_follow'),
+            models.CheckConstraint(check=~models.Q(user=models.F('following')),
+                                   name='prevent_self_follow')
+        ]
+        indexes = [
+            models.Index(
+                fields=['following', 'user'], name='follow_following_user_idx'
+            ),
         ]
 
     def __str__(self):
@@ -1,8 +1,11 @@
 from djoser.serializers import UserCreateSerializer
 from rest_framework import serializers
 
+from api.fields import PrimaryKeyListField
+from foodgram import constants
+from recipe.images import variants_ready
 from recipe.models import Recipe
-from user.models import Follow, User
+from user.models import User
 
 
 class UserRegistrationSerializer(UserCreateSerializer):
@@ -28,18 +31,47 @@ class UserSerializer(serializers.ModelSerializer):
                   'last_name', 'is_subscribed')
 
     def get_is_subscribed(self, obj):
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         user = self.context['request'].user
         return user.is_authenticated and obj.following.filter(
             following=user.id
         ).exists()
 
 
-class UserRecipeSerializer(serializers.ModelSerializer):
+class RecipeImageSerializer(serializers.ModelSerializer):
+    image_thumb = serializers.SerializerMethodField(read_only=True)
+    image_srcset = serializers.SerializerMethodField(read_only=True)
+
+    def get_image_url(self, obj, name):
+        url = obj.image.storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_image_thumb(self, obj):
+        if not obj.image:
+            return None
+        if not variants_ready(obj):
+            return self.get_image_url(obj, obj.image.name)
+        return self.get_image_url(obj, obj.image_variants['thumb'])
+
+    def get_image_srcset(self, obj):
+        if not variants_ready(obj):
+            return ''
+        return ', '.join(
+            f'{self.get_image_url(obj, name)} {width}w'
+            for name, width in obj.image_variants['srcset']
+        )
+
+
+class UserRecipeSerializer(RecipeImageSerializer):
     class Meta:
         model = Recipe
         fields = (
             'id',
             'image',
+            'image_thumb',
+            'image_srcset',
             'name',
             'cooking_time'
         )
@@ -47,7 +79,7 @@ class UserRecipeSerializer(serializers.ModelSerializer):
 
 class SubscriptionSerializer(UserSerializer):
     recipes = serializers.SerializerMethodField(read_only=True)
-    recipes_count = serializers.SerializerMethodField(read_only=True)
+    recipes_count = serializers.ReadOnlyField()
 
     class Meta:
         model = User
@@ -63,6 +95,10 @@ class SubscriptionSerializer(UserSerializer):
         )
 
     def get_recipes(self, obj):
+        if hasattr(obj, 'limited_recipes'):
+            return UserRecipeSerializer(
+                obj.limited_recipes, many=True, context=self.context
+            ).data
         recipes = obj.recipes.all()
         request = self.context.get('request')
         recipes_limit = request.query_params.get('recipes_limit')
@@ -72,36 +108,26 @@ class SubscriptionSerializer(UserSerializer):
             recipes, many=True, context=self.context
         ).data
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
 
+class UserIdsSerializer(serializers.Serializer):
+    users = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False, max_length=constants.BULK_MAX_IDS
+    )
 
-class FollowSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Follow
-        fields = (
-            'user',
-            'following'
-        )
 
-    def to_representation(self, follow):
-        serializer = SubscriptionSerializer(follow.user, context=self.context)
-        return serializer.data
+class BulkFollowSerializer(serializers.Serializer):
+    users = PrimaryKeyListField(
+        queryset=User.objects.only('id'),
+        allow_empty=False, max_length=constants.BULK_MAX_IDS,
+        error_messages={
+            'does_not_exist': 'Пользователей с id {pk_values} не существует'
+        }
+    )
 
-    def validate(self, data):
-        follower = data['following']
-        pk = self.context['pk']
-        user = data['user']
-        if not user:
-            raise serializers.ValidationError(
-                f'Пользователя с id {pk} не существует!'
-            )
-        if follower.followers.filter(user=user).exists():
-            raise serializers.ValidationError(
-                f'Вы уже подписаны на {user.username}'
-            )
-        if user == follower:
+    def validate_users(self, users):
+        if self.context['request'].user in users:
             raise serializers.ValidationError(
                 'Вы не можете подписаться на себя'
             )
-        return data
+        return users
@@ -1,19 +1,54 @@
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch, Value
 from djoser.views import UserViewSet as DjoserUserViewSet
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.status import (HTTP_201_CREATED, HTTP_204_NO_CONTENT,
                                    HTTP_400_BAD_REQUEST)
 
 from api.paginator import RecipePaginator
+from recipe.counters import change_counter, recount_counters
+from recipe.models import Recipe
+from recipe.relations import (add_relation, delete_relation, delete_relations,
+                              parse_id)
 from user.models import Follow, User
-from user.serializers import (FollowSerializer, SubscriptionSerializer,
-                              UserSerializer)
+from user.serializers import (BulkFollowSerializer, SubscriptionSerializer,
+                              UserIdsSerializer, UserSerializer)
+
+SUBSCRIPTION_FIELDS = (
+    'id', 'email', 'username', 'first_name', 'last_name', 'recipes_count'
+)
 
 
 class UserViewSet(DjoserUserViewSet):
     pagination_class = RecipePaginator
+    cursor_ordering = ('username', 'id')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset.annotate(is_subscribed=Value(False))
+        return queryset.annotate(
+            is_subscribed=Exists(
+                Follow.objects.filter(user=OuterRef('pk'), following=user)
+            )
+        )
+
+    def get_subscribed_users(self, request, users):
+        recipes = Recipe.objects.only(
+            'id', 'author', 'image', 'image_variants', 'name', 'cooking_time'
+        )
+        recipes_limit = request.query_params.get('recipes_limit')
+        if recipes_limit and recipes_limit.isdigit():
+            recipes = recipes[:int(recipes_limit)]
+        return users.annotate(
+            is_subscribed=Value(True)
+        ).order_by('username').prefetch_related(
+            Prefetch('recipes', queryset=recipes, to_attr='limited_recipes')
+        )
 
     @action(['get'], detail=False, permission_classes=[IsAuthenticated, ])
     def me(self, request, *args, **kwargs):
@@ -29,10 +64,11 @@ class UserViewSet(DjoserUserViewSet):
         permission_classes=[IsAuthenticated, ]
     )
     def subscriptions(self, request):
-        users = Follow.objects.filter(following=request.user)
+        users = self.get_subscribed_users(
+            request, User.objects.filter(following__following=request.user)
+        )
         context = {'request': request}
-        obj_users = [(user.user)for user in users]
-        page = self.paginate_queryset(obj_users)
+        page = self.paginate_queryset(users)
         serializer = SubscriptionSerializer(
             page, many=True, context=context
         )
@@ -43,24 +79,91 @@ class UserViewSet(DjoserUserViewSet):
         methods=['POST'],
         permission_classes=[IsAuthenticated, ]
     )
+    @transaction.atomic
     def subscribe(self, request, id):
-        context = {'request': request, 'pk': id}
-        data = {'user': id, 'following': request.user.id}
-        serializer = FollowSerializer(
-            data=data, context=context
+        author_id = parse_id(id)
+        if author_id == request.user.id:
+            return Response(
+                {'error': 'Вы не можете подписаться на себя'},
+                status=HTTP_400_BAD_REQUEST
+            )
+        author, created = None, False
+        if author_id is not None:
+            author, created = add_relation(
+                Follow, 'following', request.user.id, 'user', author_id,
+                SUBSCRIPTION_FIELDS
+            )
+        if author is None:
+            raise NotFound(f'Пользователя с id {id} не существует!')
+        if not created:
+            return Response(
+                {'error': f'Вы уже подписаны на {author.username}'},
+                status=HTTP_400_BAD_REQUEST
+            )
+        change_counter(User, author.id, 'followers_count', 1)
+        author.is_subscribed = True
+        serializer = SubscriptionSerializer(
+            author, context={'request': request}
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
         return Response(serializer.data, status=HTTP_201_CREATED)
 
     @subscribe.mapping.delete
+    @transaction.atomic
     def delete_subscribe(self, request, id):
-        user = get_object_or_404(User, id=id)
-        obj = Follow.objects.filter(user=user, following=request.user)
-        if obj.exists():
-            obj.delete()
-            return Response(status=HTTP_204_NO_CONTENT)
-        return Response(
-            {'error': 'Вы не подписаны!'},
-            status=HTTP_400_BAD_REQUEST
+        exists = deleted = False
+        author_id = parse_id(id)
+        if author_id is not None:
+            exists, deleted = delete_relation(
+                Follow, 'following', request.user.id, 'user', author_id
+            )
+        if not exists:
+            raise NotFound(f'Пользователя с id {id} не существует!')
+        if not deleted:
+            return Response(
+                {'error': 'Вы не подписаны!'},
+                status=HTTP_400_BAD_REQUEST
+            )
+        change_counter(User, author_id, 'followers_count', -1)
+        return Response(status=HTTP_204_NO_CONTENT)
+
+    @action(
+        detail=False,
+        methods=['POST'],
+        url_path='subscribe',
+        permission_classes=[IsAuthenticated, ]
+    )
+    @transaction.atomic
+    def bulk_subscribe(self, request):
+        serializer = BulkFollowSerializer(
+            data=request.data, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        user_ids = [user.id for user in serializer.validated_data['users']]
+        Follow.objects.bulk_create(
+            [
+                Follow(user_id=user_id, following=request.user)
+                for user_id in user_ids
+            ],
+            ignore_conflicts=True
+        )
+        recount_counters(User, user_ids, 'followers_count')
+        users = self.get_subscribed_users(
+            request, User.objects.filter(pk__in=user_ids)
+        )
+        serializer = SubscriptionSerializer(
+            users, many=True, context={'request': request}
+        )
+        return Response(serializer.data, status=HTTP_201_CREATED)
+
+    @bulk_subscribe.mapping.delete
+    @transaction.atomic
+    def bulk_delete_subscribe(self, request):
+        serializer = UserIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        deleted = delete_relations(
+            Follow, 'following', request.user.id,
+            'user', serializer.validated_data['users']
         )
+        if deleted:
+            recount_counters(User, deleted, 'followers_count')
+        return Response(status=HTTP_204_NO_CONTENT)